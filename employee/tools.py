@@ -14,15 +14,28 @@ Internal helpers:
     _load_index, _grep_scripts_impl, _tfidf_similarity
 """
 
-import json
+import heapq
 import math
+import mmap
+import os
+import pickle
 import re
 import sys
+import tempfile
+import threading
+from array import array
+from bisect import bisect_left
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, fields, is_dataclass
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Iterable, Iterator
 
-from langchain_core.tools import tool
+# orjson (pulled in by langsmith) parses the index several times faster; stdlib json is the fallback
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
 
 # Add project root to sys.path so root-level utils/ is importable
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -34,6 +47,19 @@ from utils.fuzzy_search import expand_synonyms  # noqa: E402
 EMPLOYEE_DIR = Path(__file__).parent              # employee/
 SCRIPTS_DIR = EMPLOYEE_DIR / "scripts"            # employee/scripts/
 INDEX_PATH = EMPLOYEE_DIR / "scripts_index.json"  # employee/scripts_index.json
+CACHE_PATH = EMPLOYEE_DIR / "scripts_index.cache.pkl"  # parsed index + derived structures
+_SCRIPTS_PREFIX = os.path.join(SCRIPTS_DIR, "")   # "…/employee/scripts/" for str-path checks
+
+# Parsed index, keyed by the JSON file's mtime — rebuilt only when the file changes.
+# "derived" holds structures computed from the index (columns, keyword postings, BM25 model),
+# all built together when the JSON is parsed and dropped whenever the index is reloaded.
+_INDEX_CACHE: dict[str, Any] = {"mtime_ns": None, "index": [], "derived": {}}
+
+# Serializes _write_index_cache() across the tool worker threads
+_CACHE_WRITE_LOCK = threading.Lock()
+
+# Bump when the layout of anything stored in CACHE_PATH changes
+_CACHE_VERSION = 4
 
 
 # ---------------------------------------------------------------------------
@@ -41,21 +67,232 @@ INDEX_PATH = EMPLOYEE_DIR / "scripts_index.json"  # employee/scripts_index.json
 # ---------------------------------------------------------------------------
 
 def _load_index() -> list[dict[str, Any]]:
-    """Load the pre-built script index from JSON. Returns empty list if not found."""
-    if not INDEX_PATH.exists():
+    """Load the pre-built script index from JSON. Returns empty list if not found.
+
+    The parsed list is cached and reused until scripts_index.json changes on disk,
+    so callers must treat it as read-only.
+    """
+    try:
+        mtime_ns = INDEX_PATH.stat().st_mtime_ns
+    except OSError:
         return []
+    if _INDEX_CACHE["mtime_ns"] == mtime_ns:
+        return _INDEX_CACHE["index"]
+
+    # Warm start: reuse the on-disk cache if it was written for this exact JSON file
+    cached = _read_index_cache(mtime_ns)
+    if cached is not None:
+        _INDEX_CACHE.update(mtime_ns=mtime_ns, index=cached[0], derived=cached[1])
+        return cached[0]
+
     try:
-        with INDEX_PATH.open(encoding="utf-8") as f:
-            return json.load(f)
-    except (json.JSONDecodeError, OSError):
+        index = _json_loads(INDEX_PATH.read_bytes())
+    except (ValueError, OSError):  # JSONDecodeError (both parsers) and bad UTF-8 are ValueErrors
         return []
+    _INDEX_CACHE.update(mtime_ns=mtime_ns, index=index, derived={})
+    # Build every derived structure up front so the pickle is written once per reload
+    for key, build in _DERIVED_BUILDERS.items():
+        _derived(index, key, build)
+    _write_index_cache()
+    return index
+
+
+def _read_index_cache(mtime_ns: int) -> tuple[list[dict[str, Any]], dict[str, Any]] | None:
+    """Load (index, derived) from CACHE_PATH if it matches *mtime_ns*, else None."""
+    try:
+        with CACHE_PATH.open("rb") as f:
+            payload = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, TypeError, ValueError):
+        return None  # missing, truncated, or written by an incompatible version
+    if (
+        not isinstance(payload, dict)
+        or payload.get("version") != _CACHE_VERSION
+        or payload.get("mtime_ns") != mtime_ns
+    ):
+        return None
+    derived = {
+        key: _DERIVED_TYPES[key](*value) if key in _DERIVED_TYPES else value
+        for key, value in payload["derived"].items()
+    }
+    return payload["index"], derived
+
+
+def _write_index_cache() -> None:
+    """Persist the in-memory index cache to CACHE_PATH (best effort, atomic replace).
+
+    Dataclass values are stored as plain field tuples so the pickle does not
+    depend on the module name this file was imported under. Tools run on
+    worker threads, so writes are serialized and each goes through its own
+    temporary file.
+    """
+    with _CACHE_WRITE_LOCK:
+        derived = {
+            key: tuple(getattr(value, f.name) for f in fields(value)) if is_dataclass(value) else value
+            for key, value in dict(_INDEX_CACHE["derived"]).items()
+        }
+        payload = {
+            "version": _CACHE_VERSION,
+            "mtime_ns": _INDEX_CACHE["mtime_ns"],
+            "index": _INDEX_CACHE["index"],
+            "derived": derived,
+        }
+        tmp_name = None
+        try:
+            with tempfile.NamedTemporaryFile(
+                dir=CACHE_PATH.parent, prefix=f"{CACHE_PATH.name}.", suffix=".tmp", delete=False
+            ) as f:
+                tmp_name = f.name
+                pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_name, CACHE_PATH)
+        except OSError:
+            if tmp_name is not None:
+                try:
+                    os.unlink(tmp_name)
+                except OSError:
+                    pass
+
+
+def _derived(index: list[dict[str, Any]], key: str, build: Callable[[list[dict[str, Any]]], Any]) -> Any:
+    """Return build(index), cached alongside the loaded index until it is reloaded.
+
+    Indexes that did not come from _load_index() are never cached. Persisting
+    the cache is left to _load_index(), which builds every key in one pass.
+    """
+    if index is not _INDEX_CACHE["index"]:
+        return build(index)
+    derived = _INDEX_CACHE["derived"]
+    if key not in derived:
+        derived[key] = build(index)
+    return derived[key]
+
+
+@dataclass(frozen=True, slots=True)
+class _IndexColumns:
+    """The index entries' fields as parallel lists (struct-of-arrays), indexed by doc_id.
+
+    Defaults for missing keys are applied once here, so scoring and formatting
+    read one list slot per doc instead of doing a dict .get() per field.
+    """
+    filenames: list[str]
+    class_names: list[list[str]]
+    method_names: list[list[str]]
+    docstrings: list[str]
+    xpath_counts: list[int]
+    line_counts: list[int]
+
+
+def _build_index_columns(index: list[dict[str, Any]]) -> _IndexColumns:
+    """Split the list of index entries into per-field columns."""
+    return _IndexColumns(
+        filenames=[e.get("filename") or "" for e in index],
+        class_names=[e.get("class_names") or [] for e in index],
+        method_names=[e.get("method_names") or [] for e in index],
+        docstrings=[e.get("docstring") or "" for e in index],
+        xpath_counts=[e.get("xpath_count", 0) for e in index],
+        line_counts=[e.get("line_count", 0) for e in index],
+    )
+
+
+def _get_columns(index: list[dict[str, Any]]) -> _IndexColumns:
+    """Return the cached column view of *index*, building it on first use."""
+    return _derived(index, "columns", _build_index_columns)
+
+
+def _doc_text(cols: _IndexColumns, doc_id: int) -> str:
+    """Searchable text of an index entry: filename, classes, methods, docstring."""
+    return " ".join([
+        cols.filenames[doc_id],
+        " ".join(cols.class_names[doc_id]),
+        " ".join(cols.method_names[doc_id]),
+        cols.docstrings[doc_id],
+    ])
+
+
+def _format_script_block(cols: _IndexColumns, doc_id: int, score_label: str, summary_chars: int) -> str:
+    """Format one search result: name, score, size, classes, methods, and docstring summary."""
+    method_names = cols.method_names[doc_id]
+    methods = ", ".join(method_names[:5])
+    if len(method_names) > 5:
+        methods += f" (+{len(method_names) - 5} more)"
+    classes = ", ".join(cols.class_names[doc_id])
+    doc = cols.docstrings[doc_id][:summary_chars]
+
+    return (
+        f"\n  **scripts/{cols.filenames[doc_id] or '?'}** "
+        f"({score_label}, {cols.line_counts[doc_id]} lines, {cols.xpath_counts[doc_id]} xpaths)\n"
+        f"    Classes: {classes or '(none)'}\n"
+        f"    Methods: {methods or '(none)'}\n"
+        f"    Summary: {doc or '(no docstring)'}"
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class _KeywordIndex:
+    """Inverted index for search_index: token -> ids of the entries containing it.
+
+    A doc id is the entry's position in the index list; each id appears at
+    most once per posting list (tokens are deduplicated per entry).
+    """
+    postings: dict[str, list[int]]        # token -> doc_ids (filename, classes, methods, docstring)
+    fname_postings: dict[str, list[int]]  # token -> doc_ids (filename only)
 
 
-def _get_script_files() -> list[Path]:
+def _build_keyword_index(index: list[dict[str, Any]]) -> _KeywordIndex:
+    """Tokenize every entry once and invert it into per-token posting lists."""
+    cols = _get_columns(index)
+    postings: dict[str, list[int]] = {}
+    fname_postings: dict[str, list[int]] = {}
+    for doc_id, filename in enumerate(cols.filenames):
+        for t in set(_tokenize(_doc_text(cols, doc_id))):
+            postings.setdefault(t, []).append(doc_id)
+        for t in set(_tokenize(filename)):
+            fname_postings.setdefault(t, []).append(doc_id)
+    return _KeywordIndex(postings=postings, fname_postings=fname_postings)
+
+
+def _iter_py_files(root: str | Path) -> Iterator[str]:
+    """Yield the path of every .py file under *root*, in no particular order.
+
+    Walks with an explicit stack of os.scandir() iterators — DirEntry caches
+    its type from the directory listing, so no extra stat() per entry and no
+    Path object per entry as with Path.rglob().
+    """
+    stack = [os.fspath(root)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.endswith(".py") and entry.is_file():
+                        yield entry.path
+        except OSError:
+            continue
+
+
+def _sorted_paths(paths: Iterable[str]) -> list[str]:
+    """Sort paths component-wise, matching the order of sorted(Path, ...)."""
+    return sorted(paths, key=lambda p: p.split(os.sep))
+
+
+def _get_script_files() -> list[str]:
     """Return all .py files under scripts/ sorted by name."""
     if not SCRIPTS_DIR.exists():
         return []
-    return sorted(SCRIPTS_DIR.rglob("*.py"))
+    return _sorted_paths(_iter_py_files(SCRIPTS_DIR))
+
+
+def _count_lines(path: str) -> int:
+    """Count lines in a file with one binary read and a C-level bytes.count().
+
+    A final line without a trailing newline still counts. Returns 0 if unreadable.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return 0
+    return data.count(b"\n") + (1 if data and not data.endswith(b"\n") else 0)
 
 
 def _normalize_script_path(script_path: str) -> str:
@@ -81,11 +318,47 @@ def _resolve_script_path(script_path: str) -> Path:
 
 # ---------------------------------------------------------------------------
 # TF-IDF implementation (stdlib only — no sklearn/numpy needed)
+#
+# Scripts are ranked with Okapi BM25, the length-normalized TF-IDF variant
+# used by Lucene: score(D) = Σ idf(t) · tf·(k1+1) / (tf + k1·(1 - b + b·|D|/avgdl))
 # ---------------------------------------------------------------------------
 
+_BM25_K1 = 1.5   # term-frequency saturation
+_BM25_B = 0.75   # document-length normalization strength
+_BM25_K3 = 1.5   # query-term-frequency saturation (terms repeat across synonym variants)
+
+
+@dataclass(frozen=True, slots=True)
+class _Bm25Model:
+    """Precomputed BM25 weights for every script in the index.
+
+    This is the sparse (term x doc) weight matrix stored column-wise: each
+    posting already holds the full idf · tf·(k1+1) / (tf + k1·norm(D)) term,
+    so scoring a query is a plain sum over the postings of its own terms.
+    Terms are interned to small int ids and each posting list is a pair of
+    parallel typed arrays, which is far more compact than (int, float) tuples.
+    """
+    n_docs: int
+    vocab: dict[str, int]           # term -> term_id
+    doc_ids: list[array]            # term_id -> array("i") of doc_ids containing the term
+    weights: list[array]            # term_id -> array("d") of BM25 weights, parallel to doc_ids
+
+
+# Dataclass-valued _INDEX_CACHE["derived"] entries, rebuilt from field tuples on load
+_DERIVED_TYPES: dict[str, type] = {
+    "columns": _IndexColumns,
+    "keywords": _KeywordIndex,
+    "bm25": _Bm25Model,
+}
+
+
+# Alphanumeric runs of length >= 2 — findall() both splits and drops short tokens
+_TOKEN_RE = re.compile(r"[a-z0-9]{2,}")
+
+
 def _tokenize(text: str) -> list[str]:
     """Lowercase tokenization — splits on non-alphanumeric, drops short tokens."""
-    return [t for t in re.split(r"[^a-z0-9]+", text.lower()) if len(t) > 1]
+    return _TOKEN_RE.findall(text.lower())
 
 
 def _build_tfidf_corpus(index: list[dict[str, Any]]) -> list[tuple[str, list[str]]]:
@@ -94,17 +367,93 @@ def _build_tfidf_corpus(index: list[dict[str, Any]]) -> list[tuple[str, list[str
     Combines filename, class names, method names, and docstrings into one
     token bag per script.
     """
-    corpus: list[tuple[str, list[str]]] = []
-    for entry in index:
-        text_parts = [
-            entry.get("filename", ""),
-            " ".join(entry.get("class_names", [])),
-            " ".join(entry.get("method_names", [])),
-            entry.get("docstring", ""),
-        ]
-        tokens = _tokenize(" ".join(text_parts))
-        corpus.append((entry.get("filename", "unknown"), tokens))
-    return corpus
+    cols = _get_columns(index)
+    return [
+        (filename or "unknown", _tokenize(_doc_text(cols, doc_id)))
+        for doc_id, filename in enumerate(cols.filenames)
+    ]
+
+
+def _build_bm25_model(index: list[dict[str, Any]]) -> _Bm25Model:
+    """Index the whole corpus once into per-(term, doc) BM25 weights."""
+    corpus = _build_tfidf_corpus(index)
+    n_docs = len(corpus)
+
+    vocab: dict[str, int] = {}
+    doc_ids: list[array] = []       # term_id -> doc_ids
+    term_freqs: list[array] = []    # term_id -> tf in each of those docs
+    doc_len: list[int] = []
+    for doc_id, (_, tokens) in enumerate(corpus):
+        doc_len.append(len(tokens))
+        for term_id, tf in Counter(vocab.setdefault(t, len(vocab)) for t in tokens).items():
+            if term_id == len(doc_ids):
+                doc_ids.append(array("i"))
+                term_freqs.append(array("i"))
+            doc_ids[term_id].append(doc_id)
+            term_freqs[term_id].append(tf)
+
+    avgdl = (sum(doc_len) / n_docs) if n_docs else 0.0
+    denom = [
+        _BM25_K1 * (1 - _BM25_B + _BM25_B * (dl / avgdl if avgdl else 0.0))
+        for dl in doc_len
+    ]
+
+    k1_plus_1 = _BM25_K1 + 1
+    weights: list[array] = []
+    for docs, tfs in zip(doc_ids, term_freqs):
+        # IDF (Lucene's non-negative BM25 variant)
+        idf = math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+        weights.append(array("d", (
+            idf * tf * k1_plus_1 / (tf + denom[doc_id])
+            for doc_id, tf in zip(docs, tfs)
+        )))
+
+    return _Bm25Model(n_docs=n_docs, vocab=vocab, doc_ids=doc_ids, weights=weights)
+
+
+# Builders for every _INDEX_CACHE["derived"] key, in dependency order (columns first)
+_DERIVED_BUILDERS: dict[str, Callable[[list[dict[str, Any]]], Any]] = {
+    "columns": _build_index_columns,
+    "keywords": _build_keyword_index,
+    "bm25": _build_bm25_model,
+}
+
+
+def _get_bm25_model(index: list[dict[str, Any]]) -> _Bm25Model:
+    """Return the cached BM25 model for *index*, building it on first use."""
+    return _derived(index, "bm25", _build_bm25_model)
+
+
+def _bm25_rank(
+    query: str,
+    index: list[dict[str, Any]],
+    top_k: int = 5,
+) -> list[tuple[int, float]]:
+    """Return the top_k [(doc_id, score), ...] by BM25 relevance, score descending."""
+    if not index:
+        return []
+    model = _get_bm25_model(index)
+
+    # Expand query with synonyms for better recall — one tokenization pass over all variants
+    variants = expand_synonyms(query, max_variants=8)
+    q_tf = Counter(_tokenize(" ".join(variants)))
+
+    if not q_tf:
+        return []
+
+    # Sum the precomputed weights of the query terms' postings, scaled by the
+    # Okapi query-term factor (k3+1)·qtf / (k3+qtf)
+    scores = [0.0] * model.n_docs
+    for t, qtf in q_tf.items():
+        term_id = model.vocab.get(t)
+        if term_id is None:
+            continue
+        q_weight = (_BM25_K3 + 1) * qtf / (_BM25_K3 + qtf)
+        for doc_id, weight in zip(model.doc_ids[term_id], model.weights[term_id]):
+            scores[doc_id] += q_weight * weight
+
+    results = [(doc_id, score) for doc_id, score in enumerate(scores) if score > 0.01]
+    return heapq.nlargest(top_k, results, key=lambda x: x[1])
 
 
 def _tfidf_similarity(
@@ -112,122 +461,281 @@ def _tfidf_similarity(
     index: list[dict[str, Any]],
     top_k: int = 5,
 ) -> list[tuple[str, float, dict[str, Any]]]:
-    """Rank scripts by TF-IDF cosine similarity to the query.
+    """Rank scripts by BM25 relevance to the query.
 
     Returns [(filename, score, index_entry), ...] sorted by score descending.
     Pure Python implementation — no external dependencies.
     """
-    corpus = _build_tfidf_corpus(index)
-    if not corpus:
+    ranked = _bm25_rank(query, index, top_k)
+    if not ranked:
         return []
-
-    # Expand query with synonyms for better recall
-    variants = expand_synonyms(query, max_variants=8)
-    query_tokens = []
-    for v in variants:
-        query_tokens.extend(_tokenize(v))
-    query_tokens = list(set(query_tokens))  # deduplicate
-
-    if not query_tokens:
-        return []
-
-    # Document frequency
-    n_docs = len(corpus)
-    df: Counter[str] = Counter()
-    for _, tokens in corpus:
-        unique = set(tokens)
-        for t in unique:
-            df[t] += 1
-
-    # IDF
-    idf: dict[str, float] = {}
-    for t in df:
-        idf[t] = math.log((n_docs + 1) / (df[t] + 1)) + 1  # smoothed IDF
-
-    # Query TF-IDF vector
-    q_tf = Counter(query_tokens)
-    q_vec: dict[str, float] = {}
-    for t, count in q_tf.items():
-        q_vec[t] = count * idf.get(t, 1.0)
-
-    # Score each document
-    results: list[tuple[str, float, dict[str, Any]]] = []
-    index_by_name = {e.get("filename", ""): e for e in index}
-
-    for filename, tokens in corpus:
-        d_tf = Counter(tokens)
-        d_vec: dict[str, float] = {}
-        for t, count in d_tf.items():
-            d_vec[t] = count * idf.get(t, 1.0)
-
-        # Cosine similarity
-        dot = sum(q_vec.get(t, 0) * d_vec.get(t, 0) for t in set(q_vec) | set(d_vec))
-        mag_q = math.sqrt(sum(v ** 2 for v in q_vec.values())) or 1.0
-        mag_d = math.sqrt(sum(v ** 2 for v in d_vec.values())) or 1.0
-        score = dot / (mag_q * mag_d)
-
-        if score > 0.01:
-            entry = index_by_name.get(filename, {})
-            results.append((filename, score, entry))
-
-    results.sort(key=lambda x: x[1], reverse=True)
-    return results[:top_k]
+    filenames = _get_columns(index).filenames
+    return [(filenames[doc_id] or "unknown", score, index[doc_id]) for doc_id, score in ranked]
 
 
 # ---------------------------------------------------------------------------
 # Grep implementation for scripts
 # ---------------------------------------------------------------------------
 
+_NEWLINE_RE = re.compile(rb"\n")
+_NEWLINE_TEXT_RE = re.compile("\n")
+_NON_ASCII_RE = re.compile(rb"[\x80-\xff]")
+
+_GREP_FLAGS = re.IGNORECASE | re.MULTILINE
+
+
+def _crlf_dollar(pattern: str) -> str:
+    """Rewrite each unescaped ``$`` outside a character class to ``(?=\\r?$)``.
+
+    Scripts are grepped as raw bytes, where a MULTILINE ``$`` only anchors
+    before b"\\n"; this lets it also match at the end of a CRLF line, as it
+    did when files were read as text with universal newlines.
+    """
+    out: list[str] = []
+    i, n = 0, len(pattern)
+    in_class = False
+    while i < n:
+        ch = pattern[i]
+        if ch == "\\":
+            out.append(pattern[i:i + 2])
+            i += 2
+            continue
+        if in_class:
+            if ch == "]":
+                in_class = False
+        elif ch == "[":
+            in_class = True
+            out.append(ch)
+            i += 1
+            # A "]" right after "[" or "[^" is a literal, not the end of the class
+            if i < n and pattern[i] == "^":
+                out.append("^")
+                i += 1
+            if i < n and pattern[i] == "]":
+                out.append("]")
+                i += 1
+            continue
+        elif ch == "$":
+            out.append(r"(?=\r?$)")
+            i += 1
+            continue
+        out.append(ch)
+        i += 1
+    return "".join(out)
+
+
+@dataclass(frozen=True, slots=True)
+class _GrepPattern:
+    """A user grep pattern compiled for text and, where possible, for raw bytes.
+
+    On pure-ASCII files the bytes form gives the same matches as the text
+    form without decoding anything. It is None when the pattern cannot be
+    matched byte-wise with text semantics: non-ASCII patterns (a byte class
+    would match single UTF-8 bytes, IGNORECASE would be ASCII-only) and
+    escapes such as \\u / \\N that bytes patterns reject.
+    """
+    text: re.Pattern[str]
+    raw: re.Pattern[bytes] | None
+
+
+def _compile_grep_pattern(pattern: str) -> _GrepPattern:
+    """Compile a user pattern for grep. Raises re.error if it is invalid."""
+    text = re.compile(pattern, _GREP_FLAGS)
+    if "$" in pattern:
+        try:
+            text = re.compile(_crlf_dollar(pattern), _GREP_FLAGS)
+        except re.error:
+            pass  # keep the pattern as written
+    raw = None
+    if pattern.isascii():
+        try:
+            raw = re.compile(text.pattern.encode("ascii"), _GREP_FLAGS)
+        except re.error:
+            pass  # e.g. \u escapes: text-only
+    return _GrepPattern(text, raw)
+
+
+# Below this size a single read() is cheaper than setting up and tearing down an mmap
+_MMAP_MIN_SIZE = 64 * 1024
+
+
+def _matching_line_indices(
+    regex: re.Pattern,
+    buf: bytes | mmap.mmap | str,
+    newlines: list[int],
+    limit: int,
+) -> list[int]:
+    """Return 0-based indices of the first *limit* lines in *buf* that contain a match.
+
+    Scans the whole buffer with the compiled pattern instead of calling
+    search() once per line: after each hit the scan jumps to the start of
+    the next line, and line numbers are resolved by bisecting *newlines*
+    (the offsets of every newline in *buf*).
+    A hit that runs across a newline is re-checked against its own line only,
+    so results match line-by-line grep semantics.
+    *regex* must be compiled with re.MULTILINE so ^/$ anchor per line.
+    """
+    indices: list[int] = []
+    n = len(buf)
+    ends_with_newline = bool(newlines) and newlines[-1] == n - 1
+    pos = 0
+    while pos < n and len(indices) < limit:
+        m = regex.search(buf, pos)
+        if m is None:
+            break
+        start = m.start()
+        if start == n and ends_with_newline:
+            break  # empty match after the final newline — not a real line
+        line_no = bisect_left(newlines, start)
+        line_start = newlines[line_no - 1] + 1 if line_no else 0
+        line_end = newlines[line_no] if line_no < len(newlines) else n
+        if m.end() <= line_end or regex.search(buf, line_start, line_end):
+            indices.append(line_no)
+        pos = line_end + 1
+    return indices
+
+
+def _scan_buffer(
+    rel: str,
+    buf: bytes | mmap.mmap,
+    pattern: _GrepPattern,
+    context_lines: int,
+    max_matches: int,
+) -> tuple[str, list[str], int] | None:
+    """Grep one file's raw bytes, stopping after *max_matches* matching lines.
+
+    Pure-ASCII files are searched as bytes and only the lines actually
+    printed are decoded; anything else is decoded once and searched as text.
+    """
+    if pattern.raw is not None and _NON_ASCII_RE.search(buf) is None:
+        regex: re.Pattern = pattern.raw
+        newline_re: re.Pattern = _NEWLINE_RE
+    else:
+        buf = bytes(buf).decode("utf-8", errors="replace")
+        regex, newline_re = pattern.text, _NEWLINE_TEXT_RE
+    if regex.search(buf) is None:
+        return None
+
+    newlines = [m.start() for m in newline_re.finditer(buf)]
+    match_indices = _matching_line_indices(regex, buf, newlines, max_matches)
+    if not match_indices:
+        return None
+
+    n = len(buf)
+    n_lines = len(newlines) + (0 if newlines and newlines[-1] == n - 1 else 1)
+
+    def line_text(i: int) -> str:
+        s = newlines[i - 1] + 1 if i else 0
+        e = newlines[i] if i < len(newlines) else n
+        chunk = buf[s:e]
+        text = chunk if isinstance(chunk, str) else chunk.decode("utf-8", errors="replace")
+        return text.rstrip("\r")
+
+    # Merge each match's [s, e) context window with any overlapping or adjacent
+    # one (match_indices is ascending), so every line is emitted exactly once
+    windows: list[list[int]] = []
+    for mi in match_indices:
+        s = max(0, mi - context_lines)
+        e = min(n_lines, mi + context_lines + 1)
+        if windows and s <= windows[-1][1]:
+            windows[-1][1] = e
+        else:
+            windows.append([s, e])
+
+    match_set = set(match_indices)
+    file_block: list[str] = [f"\n--- scripts/{rel} ---"]
+    for s, e in windows:
+        for i in range(s, e):
+            marker = ">>>" if i in match_set else "   "
+            file_block.append(f"  {marker} L{i + 1:4d}: {line_text(i)}")
+        file_block.append("")
+
+    if len(match_indices) >= max_matches:
+        file_block.append(f"  [Per-file limit: first {max_matches} matches shown for scripts/{rel}.]")
+
+    return rel, file_block, len(match_indices)
+
+
+def _scan_file(
+    filepath: str,
+    pattern: _GrepPattern,
+    context_lines: int,
+    max_matches: int,
+) -> tuple[str, list[str], int] | None:
+    """Grep one script file. Returns (rel_path, block_lines, n_matches), or None if no match.
+
+    Pure-ASCII files are searched as raw bytes, so they are never decoded or
+    split into per-line strings as a whole: small files are read in one call,
+    larger ones are memory-mapped.
+    """
+    rel = os.path.relpath(filepath, SCRIPTS_DIR) if filepath.startswith(_SCRIPTS_PREFIX) else os.path.basename(filepath)
+    try:
+        with open(filepath, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return None  # empty file — nothing to match (and nothing to map)
+            if size < _MMAP_MIN_SIZE:
+                return _scan_buffer(rel, f.read(), pattern, context_lines, max_matches)
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return _scan_buffer(rel, mm, pattern, context_lines, max_matches)
+    except (OSError, ValueError):
+        return None
+
+
 def _grep_scripts_impl(
     pattern: str,
     search_root: Path,
     context_lines: int = 3,
     max_matches: int = 40,
 ) -> str:
-    """Core grep — search .py files for a regex pattern with context lines."""
+    """Core grep — search .py files for a regex pattern with context lines.
+
+    Files are scanned concurrently on a thread pool (file reads release the
+    GIL); results are consumed in path order so output stays deterministic.
+    When searching a directory, each file stops scanning after
+    max_matches // 4 matching lines (like ripgrep's --max-count) so one noisy
+    file cannot crowd out the rest; a single file gets the full max_matches.
+    """
     try:
-        regex = re.compile(pattern, re.IGNORECASE)
+        compiled = _compile_grep_pattern(pattern)
     except re.error as exc:
         return f"Invalid regex '{pattern}': {exc}"
 
-    py_files = sorted(search_root.rglob("*.py")) if search_root.is_dir() else [search_root]
+    if search_root.is_dir():
+        py_files = _sorted_paths(_iter_py_files(search_root))
+        per_file_limit = max(1, max_matches // 4)
+    else:
+        py_files = [str(search_root)]
+        per_file_limit = max_matches
+    if not py_files:
+        return f"No matches for pattern '{pattern}' in scripts."
 
     all_blocks: list[str] = []
     total_matches = 0
 
-    for filepath in py_files:
-        rel = filepath.relative_to(SCRIPTS_DIR) if SCRIPTS_DIR in filepath.parents or filepath.parent == SCRIPTS_DIR else filepath.name
-        try:
-            lines = filepath.read_text(encoding="utf-8").splitlines()
-        except OSError:
-            continue
+    workers = min(len(py_files), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(_scan_file, fp, compiled, context_lines, per_file_limit)
+            for fp in py_files
+        ]
 
-        match_indices = [i for i, ln in enumerate(lines) if regex.search(ln)]
-        if not match_indices:
-            continue
+        for future in futures:
+            result = future.result()
+            if result is None:
+                continue
+            _, file_block, n_matches = result
 
-        file_block: list[str] = [f"\n--- scripts/{rel} ---"]
-        seen: set[int] = set()
-
-        for mi in match_indices:
-            s = max(0, mi - context_lines)
-            e = min(len(lines), mi + context_lines + 1)
-            for i in range(s, e):
-                if i not in seen:
-                    marker = ">>>" if i == mi else "   "
-                    file_block.append(f"  {marker} L{i + 1:4d}: {lines[i]}")
-                    seen.add(i)
-            file_block.append("")
-
-        all_blocks.extend(file_block)
-        total_matches += len(match_indices)
-
-        if total_matches >= max_matches:
-            all_blocks.append(
-                f"  [Limit: {max_matches} matches reached. "
-                "Narrow your pattern or add script_path= to reduce scope.]"
-            )
-            break
+            all_blocks.extend(file_block)
+            total_matches += n_matches
+
+            if total_matches >= max_matches:
+                all_blocks.append(
+                    f"  [Limit: {max_matches} matches reached. "
+                    "Narrow your pattern or add script_path= to reduce scope.]"
+                )
+                executor.shutdown(wait=False, cancel_futures=True)
+                break
 
     if not all_blocks:
         return f"No matches for pattern '{pattern}' in scripts."
@@ -239,8 +747,25 @@ def _grep_scripts_impl(
 # LangChain tools — exposed to the agent
 # ---------------------------------------------------------------------------
 
-@tool
-def list_scripts() -> str:
+# Tool functions by tool name. They are wrapped with LangChain's @tool only on
+# first access through the module __getattr__ below, so code that imports this
+# module just for its search helpers never pays the langchain_core import.
+_TOOL_FUNCS: dict[str, Callable[..., str]] = {}
+
+
+def _agent_tool(fn: Callable[..., str]) -> Callable[..., str]:
+    """Register ``_<name>`` as the implementation of the agent tool ``<name>``."""
+    _TOOL_FUNCS[fn.__name__.removeprefix("_")] = fn
+    return fn
+
+
+# Outline lines: class/method definitions, docstring delimiters, and decorators.
+# [^\S\n] is whitespace other than a newline, so a match never starts on a blank line above.
+_OUTLINE_RE = re.compile(r"^[^\S\n]*(?:class |def |\"\"\"|'''|@)", re.MULTILINE)
+
+
+@_agent_tool
+def _list_scripts() -> str:
     """List all indexed Selenium scripts with a compact summary of each.
 
     Returns filename, line count, number of test methods, and XPath count
@@ -255,29 +780,27 @@ def list_scripts() -> str:
                 "No scripts found. Add Selenium .py test files to employee/scripts/ "
                 "and run build_index.py to create the index."
             )
-        entries = []
-        for f in files:
-            rel = f.relative_to(SCRIPTS_DIR)
-            try:
-                lc = sum(1 for _ in f.open(encoding="utf-8"))
-            except OSError:
-                lc = 0
-            entries.append(f"  scripts/{rel}  ({lc} lines)")
+        with ThreadPoolExecutor(max_workers=min(len(files), os.cpu_count() or 1)) as executor:
+            line_counts = list(executor.map(_count_lines, files))
+        entries = [
+            f"  scripts/{os.path.relpath(f, SCRIPTS_DIR)}  ({lc} lines)"
+            for f, lc in zip(files, line_counts)
+        ]
         return "Scripts (no index — run build_index.py):\n" + "\n".join(entries)
 
-    entries: list[str] = []
-    for e in index:
-        name = e.get("filename", "?")
-        lines = e.get("line_count", 0)
-        methods = len(e.get("method_names", []))
-        xpaths = e.get("xpath_count", 0)
-        entries.append(f"  scripts/{name}  ({lines} lines, {methods} methods, {xpaths} xpaths)")
+    cols = _get_columns(index)
+    entries = [
+        f"  scripts/{name or '?'}  ({lines} lines, {len(methods)} methods, {xpaths} xpaths)"
+        for name, lines, methods, xpaths in zip(
+            cols.filenames, cols.line_counts, cols.method_names, cols.xpath_counts
+        )
+    ]
 
     return f"Indexed scripts ({len(index)} total):\n" + "\n".join(entries)
 
 
-@tool
-def search_index(query: str) -> str:
+@_agent_tool
+def _search_index(query: str) -> str:
     """Search the pre-built script index for scripts matching a keyword query.
 
     This is the FASTEST search — it matches against filenames, class names,
@@ -298,70 +821,42 @@ def search_index(query: str) -> str:
             "and run: python employee/build_index.py"
         )
 
-    # Expand query with synonyms
+    # Expand query with synonyms — one tokenization pass over all variants
     variants = expand_synonyms(query, max_variants=12)
-    query_tokens_all: set[str] = set()
-    for v in variants:
-        query_tokens_all.update(_tokenize(v))
+    query_set = frozenset(_tokenize(" ".join(variants)))
 
-    if not query_tokens_all:
+    if not query_set:
         return f"No searchable tokens in query '{query}'."
 
-    # Score each index entry
-    scored: list[tuple[float, dict[str, Any]]] = []
-    for entry in index:
-        text = " ".join([
-            entry.get("filename", ""),
-            " ".join(entry.get("class_names", [])),
-            " ".join(entry.get("method_names", [])),
-            entry.get("docstring", ""),
-        ]).lower()
-
-        text_tokens = set(_tokenize(text))
-        if not text_tokens:
-            continue
-
-        # Token overlap score
-        overlap = len(query_tokens_all & text_tokens)
-        if overlap == 0:
-            continue
+    # Count token overlap per entry by walking only the query tokens' posting lists
+    keywords = _derived(index, "keywords", _build_keyword_index)
+    overlap: Counter[int] = Counter()
+    fname_overlap: Counter[int] = Counter()
+    for t in query_set:
+        overlap.update(keywords.postings.get(t, ()))
+        fname_overlap.update(keywords.fname_postings.get(t, ()))
 
-        # Bonus for filename match
-        fname_tokens = set(_tokenize(entry.get("filename", "")))
-        fname_overlap = len(query_tokens_all & fname_tokens)
-
-        score = overlap + fname_overlap * 0.5
-        scored.append((score, entry))
-
-    scored.sort(key=lambda x: x[0], reverse=True)
+    # Score = token overlap + bonus for filename match; doc_id order keeps ties in index order
+    scored: list[tuple[float, int]] = [
+        (overlap[doc_id] + fname_overlap[doc_id] * 0.5, doc_id)
+        for doc_id in sorted(overlap)
+    ]
 
     if not scored:
         return f"No scripts matching '{query}' found in index. Try grep_scripts() or find_similar_scripts()."
 
-    # Return top 10
-    results: list[str] = []
-    for score, entry in scored[:10]:
-        name = entry.get("filename", "?")
-        classes = ", ".join(entry.get("class_names", []))
-        methods = ", ".join(entry.get("method_names", [])[:5])
-        if len(entry.get("method_names", [])) > 5:
-            methods += f" (+{len(entry['method_names']) - 5} more)"
-        doc = (entry.get("docstring", "") or "")[:120]
-        xpaths = entry.get("xpath_count", 0)
-        lines = entry.get("line_count", 0)
-
-        results.append(
-            f"\n  **scripts/{name}** (score={score:.1f}, {lines} lines, {xpaths} xpaths)\n"
-            f"    Classes: {classes or '(none)'}\n"
-            f"    Methods: {methods or '(none)'}\n"
-            f"    Summary: {doc or '(no docstring)'}"
-        )
+    # Return top 10 — O(N log k) selection instead of sorting every match
+    cols = _get_columns(index)
+    results = [
+        _format_script_block(cols, doc_id, f"score={score:.1f}", summary_chars=120)
+        for score, doc_id in heapq.nlargest(10, scored, key=lambda x: x[0])
+    ]
 
     return f"[{len(scored)} scripts match '{query}', showing top {min(10, len(scored))}]\n" + "\n".join(results)
 
 
-@tool
-def get_script_outline(script_path: str) -> str:
+@_agent_tool
+def _get_script_outline(script_path: str) -> str:
     """Return the class names, method signatures, and docstrings of a Selenium script.
 
     Use this to understand a script's structure before reading it in full.
@@ -378,28 +873,30 @@ def get_script_outline(script_path: str) -> str:
         return "Provide a file path, not a directory. Use list_scripts() to see available files."
 
     try:
-        lines = full.read_text(encoding="utf-8").splitlines()
+        source = full.read_text(encoding="utf-8")
     except OSError as exc:
         return f"Error reading scripts/{normalized}: {exc}"
 
+    # One pass over the whole file; line numbers resolved incrementally with str.count()
     outline: list[str] = []
-    for i, line in enumerate(lines, 1):
-        stripped = line.rstrip()
-        # Match class definitions, method definitions, and docstrings
-        if re.match(r"^\s*(class |def |    \"\"\"|\"\"\"|    \'\'\'|\'\'\')", stripped):
-            outline.append(f"  L{i:4d}: {stripped}")
-        # Also capture decorators
-        elif re.match(r"^\s*@", stripped):
-            outline.append(f"  L{i:4d}: {stripped}")
+    line_no = 1
+    counted_to = 0
+    for m in _OUTLINE_RE.finditer(source):
+        start = m.start()
+        line_no += source.count("\n", counted_to, start)
+        counted_to = start
+        end = source.find("\n", start)
+        outline.append(f"  L{line_no:4d}: {source[start:end if end != -1 else None].rstrip()}")
 
     if not outline:
         return f"No class/method definitions found in scripts/{normalized}."
 
-    return f"Outline of scripts/{normalized} ({len(lines)} lines):\n" + "\n".join(outline)
+    n_lines = source.count("\n") + (1 if source and not source.endswith("\n") else 0)
+    return f"Outline of scripts/{normalized} ({n_lines} lines):\n" + "\n".join(outline)
 
 
-@tool
-def read_script(script_path: str, start_line: int = 1, end_line: int = 0) -> str:
+@_agent_tool
+def _read_script(script_path: str, start_line: int = 1, end_line: int = 0) -> str:
     """Read lines from a Selenium script file.
 
     Call get_script_outline() first to see the structure, then read specific
@@ -453,8 +950,8 @@ def read_script(script_path: str, start_line: int = 1, end_line: int = 0) -> str
     )
 
 
-@tool
-def grep_scripts(
+@_agent_tool
+def _grep_scripts(
     pattern: str,
     script_path: str = "",
     context_lines: int = 3,
@@ -494,13 +991,13 @@ def grep_scripts(
     )
 
 
-@tool
-def find_similar_scripts(query: str, top_k: int = 5) -> str:
-    """Find scripts semantically similar to a natural-language query using TF-IDF scoring.
+@_agent_tool
+def _find_similar_scripts(query: str, top_k: int = 5) -> str:
+    """Find scripts semantically similar to a natural-language query using BM25 (TF-IDF) scoring.
 
     This is the best tool for natural-language queries like expanded test case descriptions.
     It compares your query against all script metadata (names, classes, methods, docstrings)
-    using TF-IDF cosine similarity with automatic synonym expansion.
+    using BM25 relevance ranking with automatic synonym expansion.
 
     Use this when keyword search (search_index) and grep haven't found good matches.
 
@@ -518,27 +1015,16 @@ def find_similar_scripts(query: str, top_k: int = 5) -> str:
         )
 
     top_k = min(max(int(top_k), 1), 10)
-    results = _tfidf_similarity(query, index, top_k=top_k)
+    results = _bm25_rank(query, index, top_k=top_k)
 
     if not results:
         return f"No scripts with similarity > 0.01 for query: '{query}'"
 
-    blocks: list[str] = []
-    for filename, score, entry in results:
-        classes = ", ".join(entry.get("class_names", []))
-        methods = ", ".join(entry.get("method_names", [])[:5])
-        if len(entry.get("method_names", [])) > 5:
-            methods += f" (+{len(entry['method_names']) - 5} more)"
-        doc = (entry.get("docstring", "") or "")[:150]
-        xpaths = entry.get("xpath_count", 0)
-        lines = entry.get("line_count", 0)
-
-        blocks.append(
-            f"\n  **scripts/{filename}** (similarity={score:.3f}, {lines} lines, {xpaths} xpaths)\n"
-            f"    Classes: {classes or '(none)'}\n"
-            f"    Methods: {methods or '(none)'}\n"
-            f"    Summary: {doc or '(no docstring)'}"
-        )
+    cols = _get_columns(index)
+    blocks = [
+        _format_script_block(cols, doc_id, f"similarity={score:.3f}", summary_chars=150)
+        for doc_id, score in results
+    ]
 
     return f"[Top {len(results)} similar scripts for '{query[:60]}...']\n" + "\n".join(blocks)
 
@@ -547,11 +1033,15 @@ def find_similar_scripts(query: str, top_k: int = 5) -> str:
 # Convenience: all tools in a list for easy import
 # ---------------------------------------------------------------------------
 
-ALL_TOOLS = [
-    list_scripts,
-    search_index,
-    get_script_outline,
-    read_script,
-    grep_scripts,
-    find_similar_scripts,
-]
+def __getattr__(name: str) -> Any:
+    """Build the LangChain tools (and ALL_TOOLS) on first access, then cache them as globals."""
+    if name == "ALL_TOOLS":
+        value = [__getattr__(tool_name) for tool_name in _TOOL_FUNCS]
+    elif name in _TOOL_FUNCS:
+        from langchain_core.tools import tool
+
+        value = tool(name)(_TOOL_FUNCS[name])
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
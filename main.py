@@ -4,18 +4,8 @@ import json
 import subprocess
 from typing import Any, Dict
 
-# Deep agents + langgraph stores (based on docs)
-from deepagents import create_deep_agent
-from deepagents.backends import CompositeBackend, StateBackend, FilesystemBackend
-from langgraph.store.memory import InMemoryStore
-from langgraph.checkpoint.memory import MemorySaver
-
-# Chat model
-from langchain_openrouter import ChatOpenRouter
-from langchain.messages import SystemMessage, HumanMessage
-
-# Tool
-from langchain.tools import tool, ToolRuntime
+# deepagents / langgraph / langchain_openrouter are imported inside the factories
+# below, so importing this module stays cheap until a model or backend is built.
 
 
 # Base root for all agent-specific filesystem roots
@@ -50,6 +40,8 @@ def create_model(model_id: str | None = None, **kwargs: Any):
 
     Falls back to DEFAULT_MODEL if none specified.
     """
+    from langchain_openrouter import ChatOpenRouter
+
     model_id = model_id or DEFAULT_MODEL
     return ChatOpenRouter(
         model=model_id,
@@ -62,13 +54,22 @@ def create_model(model_id: str | None = None, **kwargs: Any):
 
 # ---------- Backend factory for a given agent (filesystem rooted per-agent) ----------
 def filesystem_backend_for(agent_name: str):
+    from deepagents.backends import FilesystemBackend
+
     root_dir = os.path.join(ROOT, agent_name)
     ensure_dirs(root_dir)
     # virtual_mode=True prevents traversal outside root_dir via agent tools
     return FilesystemBackend(root_dir=root_dir, virtual_mode=True)
 
 # ---------- Checkpointer (useful for human-in-the-loop) ----------
-checkpointer = MemorySaver()
+def __getattr__(name: str) -> Any:
+    """Create the module-level ``checkpointer`` on first access."""
+    if name == "checkpointer":
+        from langgraph.checkpoint.memory import MemorySaver
+
+        globals()["checkpointer"] = MemorySaver()
+        return globals()["checkpointer"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 
@@ -0,0 +1,109 @@
+"""
+Playwright IFT Agent — Backends
+
+Filesystem backend shared by every agent built in this process:
+
+    CachedFilesystemBackend — FilesystemBackend whose download_files() keeps
+    file contents keyed by the file's identity, mtime and size, in an LRU
+    capped at DOWNLOAD_CACHE_MAX_BYTES. deepagents loads AGENTS.md and every
+    skills/*/SKILL.md through download_files() at the start of each thread,
+    so after the first run those loads cost one stat() per file.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from deepagents.backends import FilesystemBackend
+from deepagents.backends.protocol import FileDownloadResponse
+
+
+# Default cap on the file contents one backend keeps cached (least recently used go first)
+DOWNLOAD_CACHE_MAX_BYTES = 8 * 1024 * 1024
+
+
+class CachedFilesystemBackend(FilesystemBackend):
+    """FilesystemBackend with an mtime-validated LRU cache in front of download_files()."""
+
+    def __init__(self, *args, download_cache_max_bytes: int = DOWNLOAD_CACHE_MAX_BYTES, **kwargs):
+        super().__init__(*args, **kwargs)
+        # virtual path -> ((st_dev, st_ino, st_mtime_ns, st_size), content), least recently used first
+        self._download_cache: OrderedDict[str, tuple[tuple[int, int, int, int], bytes]] = OrderedDict()
+        self._download_cache_bytes = 0
+        self._download_cache_max_bytes = download_cache_max_bytes
+        # Tools run on worker threads; guards the cache and its byte count together
+        self._download_lock = threading.Lock()
+
+    def _local_path(self, path: str) -> Path | None:
+        """The file *path* refers to, or None to leave it to the base class uncached.
+
+        Goes through FilesystemBackend's private _resolve_path() so path rules
+        (virtual mode, traversal checks) stay exactly the base class's; if a
+        deepagents release drops or changes it, downloads just stop being cached.
+        """
+        resolve = getattr(super(), "_resolve_path", None)
+        if resolve is None:
+            return None
+        try:
+            return Path(resolve(path))
+        except (OSError, TypeError, ValueError):
+            return None
+
+    def download_files(self, paths: list[str]) -> list[FileDownloadResponse]:
+        responses: list[FileDownloadResponse] = []
+        for path in paths:
+            local = self._local_path(path)
+            try:
+                # os.stat() follows symlinks. In virtual mode _resolve_path() has
+                # already resolved them, so this stats the very file the base
+                # class reads; otherwise a symlinked file fails the base class's
+                # O_NOFOLLOW open and is never cached.
+                st = os.stat(local) if local is not None else None
+            except OSError:
+                st = None
+            if st is None:
+                # Missing / invalid path: the base class maps it to an error response
+                self._uncache(path)
+                responses.extend(super().download_files([path]))
+                continue
+
+            key = (st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size)
+            with self._download_lock:
+                cached = self._download_cache.get(path)
+                if cached is not None and cached[0] == key:
+                    self._download_cache.move_to_end(path)
+            if cached is not None and cached[0] == key:
+                responses.append(FileDownloadResponse(path=path, content=cached[1], error=None))
+                continue
+
+            (response,) = super().download_files([path])
+            if response.error is None and response.content is not None:
+                self._cache(path, key, response.content)
+            else:
+                self._uncache(path)
+            responses.append(response)
+        return responses
+
+    def _cache(self, path: str, key: tuple[int, int, int, int], content: bytes) -> None:
+        """Store *content* for *path*, evicting least recently used entries over the byte cap."""
+        with self._download_lock:
+            self._pop(path)
+            if len(content) > self._download_cache_max_bytes:
+                return  # would evict everything else and still not fit
+            self._download_cache[path] = (key, content)
+            self._download_cache_bytes += len(content)
+            while self._download_cache_bytes > self._download_cache_max_bytes:
+                _, (_, evicted) = self._download_cache.popitem(last=False)
+                self._download_cache_bytes -= len(evicted)
+
+    def _uncache(self, path: str) -> None:
+        """Drop any cached content for *path*."""
+        with self._download_lock:
+            self._pop(path)
+
+    def _pop(self, path: str) -> None:
+        """Remove *path*'s entry and its bytes from the total. Caller holds the lock."""
+        entry = self._download_cache.pop(path, None)
+        if entry is not None:
+            self._download_cache_bytes -= len(entry[1])
@@ -0,0 +1,141 @@
+"""
+Playwright IFT Agent — Middleware
+
+Agent middleware that runs around every tool call. Currently one piece:
+
+    TruncatingToolMiddleware — spills oversized tool results (page snapshots,
+    console dumps, network logs) to a content-addressed artifact file and
+    hands the model a short preview plus a pointer it can read_file on demand.
+"""
+
+import asyncio
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+from langchain.agents.middleware import AgentMiddleware, ToolCallRequest
+from langchain_core.messages import ToolMessage
+from langgraph.types import Command
+
+# Key under ToolMessage.additional_kwargs that marks a truncated result
+TRUNCATED_KEY = "truncated"
+
+# deepagents' filesystem tools. Never truncated: read_file is how the agent
+# pages through a spilled artifact, and it already limits what it returns.
+FILESYSTEM_TOOLS = frozenset({"ls", "read_file", "write_file", "edit_file", "glob", "grep", "execute"})
+
+
+def _split_content(content: Any) -> tuple[str, list]:
+    """Return (joined text, non-text blocks) for str or content-block lists."""
+    if isinstance(content, str):
+        return content, []
+    texts: list[str] = []
+    others: list = []
+    for block in content or ():
+        if isinstance(block, str):
+            texts.append(block)
+        elif isinstance(block, dict) and block.get("type") == "text":
+            texts.append(block.get("text", ""))
+        else:
+            others.append(block)
+    return "\n".join(texts), others
+
+
+class TruncatingToolMiddleware(AgentMiddleware):
+    """Replace tool results longer than ``max_chars`` with a preview stub.
+
+    The full text is written once to ``artifact_dir/<blake2b>.txt`` (identical
+    outputs share a file) and the stub tells the agent the matching path under
+    ``virtual_dir`` so it can page through it with read_file. Non-text blocks
+    (screenshots) are kept as-is. Tools named in ``exempt_tools`` (by default
+    the filesystem tools) pass through untouched.
+    """
+
+    def __init__(
+        self,
+        artifact_dir: Path,
+        virtual_dir: str,
+        max_chars: int = 16_384,
+        preview_chars: int = 4_096,
+        exempt_tools: frozenset[str] = FILESYSTEM_TOOLS,
+    ):
+        super().__init__()
+        self.artifact_dir = artifact_dir
+        self.virtual_dir = virtual_dir.rstrip("/")
+        self.max_chars = max_chars
+        self.preview_chars = min(preview_chars, max_chars)
+        self.exempt_tools = exempt_tools
+
+    # -- hooks --------------------------------------------------------------
+
+    def wrap_tool_call(
+        self,
+        request: ToolCallRequest,
+        handler: Callable[[ToolCallRequest], ToolMessage | Command],
+    ) -> ToolMessage | Command:
+        result = handler(request)
+        if self._exempt(request) or not self._oversized(result):
+            return result
+        return self._shrink(result)
+
+    async def awrap_tool_call(
+        self,
+        request: ToolCallRequest,
+        handler: Callable[[ToolCallRequest], Awaitable[ToolMessage | Command]],
+    ) -> ToolMessage | Command:
+        result = await handler(request)
+        if self._exempt(request) or not self._oversized(result):
+            return result
+        # Hashing + the artifact write stay off the event loop
+        return await asyncio.to_thread(self._shrink, result)
+
+    # -- internals ----------------------------------------------------------
+
+    def _exempt(self, request: ToolCallRequest) -> bool:
+        return request.tool_call.get("name") in self.exempt_tools
+
+    def _oversized(self, result: Any) -> bool:
+        if not isinstance(result, ToolMessage):
+            return False
+        content = result.content
+        if isinstance(content, str):
+            return len(content) > self.max_chars
+        return len(_split_content(content)[0]) > self.max_chars
+
+    def _shrink(self, result: ToolMessage) -> ToolMessage:
+        text, others = _split_content(result.content)
+        data = text.encode("utf-8")
+        digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+        name = f"{digest}.txt"
+
+        path = self.artifact_dir / name
+        if not path.exists():
+            self.artifact_dir.mkdir(parents=True, exist_ok=True)
+            # Unique temp name: concurrent spills of the same output must not share one
+            with tempfile.NamedTemporaryFile(
+                dir=self.artifact_dir, prefix=f"{digest}.", suffix=".tmp", delete=False
+            ) as tmp:
+                tmp.write(data)
+            try:
+                os.replace(tmp.name, path)
+            except OSError:
+                os.unlink(tmp.name)
+                raise
+
+        virtual_path = f"{self.virtual_dir}/{name}"
+        stub = (
+            f"{text[:self.preview_chars]}\n\n"
+            f"[Output truncated: showing the first {self.preview_chars:,} of "
+            f"{len(text):,} characters. Full output saved to {virtual_path} — "
+            f"use read_file to page through it.]"
+        )
+        content: Any = [{"type": "text", "text": stub}, *others] if others else stub
+        return result.model_copy(update={
+            "content": content,
+            "additional_kwargs": {
+                **result.additional_kwargs,
+                TRUNCATED_KEY: {"blake2b": digest, "size": len(text), "path": virtual_path},
+            },
+        })
@@ -13,9 +13,10 @@ Input:  3 messages (provided interactively or via CLI flags):
 
 Architecture:
     - Playwright MCP tools loaded via MultiServerMCPClient (stdio transport)
+    - MCPBrowserPool keeps MCP sessions (server + Chromium) warm for reuse
     - Custom Postman/SOAP tools from tools.py (read-only)
     - Human-in-the-loop: mutation tools require human approval
-    - FilesystemBackend rooted at playwright/
+    - FilesystemBackend rooted at playwright/ (file loads cached by mtime, backends.py)
     - AGENTS.md  → loaded as agent memory
     - skills/    → test-executor, browser-tools, api-requests, folder-structure
 
@@ -34,25 +35,35 @@ Usage:
 
     # Headed mode (default) vs headless:
     uv run python playwright/playwright.py --headless --url "http://localhost:8080"
+
+    # Start every browser context logged in (Playwright storageState JSON):
+    PW_STORAGE_STATE=auth/state.json uv run python playwright/playwright.py --url "http://localhost:8080"
 """
 
 import argparse
 import asyncio
+import contextlib
 import hashlib
+import json
 import os
 import re
+import shlex
+import subprocess
 import sys
+import tempfile
+import time
+from collections import deque
+from collections.abc import Mapping
+from dataclasses import dataclass, field
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Callable
 
-from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
-from langchain.agents.middleware import ModelRetryMiddleware
-from langchain.agents.middleware.tool_retry import ToolRetryMiddleware
-from langgraph.checkpoint.memory import MemorySaver
-from langgraph.types import Command
 from rich.console import Console
 from rich.live import Live
+from rich.markup import escape
 from rich.markdown import Markdown
 from rich.panel import Panel
 from rich.prompt import Prompt, Confirm
@@ -60,17 +71,31 @@ from rich.spinner import Spinner
 from rich.table import Table
 from rich.text import Text
 
-from deepagents import create_deep_agent
-from deepagents.backends import FilesystemBackend
+# langchain / langgraph / deepagents (and the custom tools and middleware built
+# on them) take well over a second to import, so they are imported where first
+# needed — --help and the input prompts come up without waiting on them.
+if TYPE_CHECKING:
+    from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
 
-# Custom Postman/SOAP tools (read-only)
-from tools import ALL_TOOLS as CUSTOM_TOOLS
+# orjson (pulled in by langsmith) serializes tool args several times faster; stdlib json is the fallback
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # ---------------------------------------------------------------------------
 # Paths
 # ---------------------------------------------------------------------------
 PLAYWRIGHT_DIR = Path(__file__).parent           # playwright/
 RUNS_DIR = PLAYWRIGHT_DIR / "runs"               # playwright/runs/
+CHECKPOINT_DB = RUNS_DIR / "checkpoints.db"      # playwright/runs/checkpoints.db — HITL/resume state
+ARTIFACTS_DIR = RUNS_DIR / "artifacts"           # playwright/runs/artifacts/ — full text of truncated tool results
+
+# Tool results longer than this many characters are spilled to ARTIFACTS_DIR
+PW_TOOL_RESULT_MAX_CHARS = int(os.environ.get("PW_TOOL_RESULT_MAX_CHARS", "16384"))
+
+_SLUG_RE = re.compile(r"[^a-z0-9]+")             # run-file slug: runs of anything but [a-z0-9] -> "-"
+_TIMESTAMP_FMT = "%Y-%m-%d_%H-%M-%S"             # run-file timestamp prefix
 
 console = Console()
 
@@ -114,65 +139,361 @@ MUTATION_TOOLS = frozenset({
     "browser_evaluate",
 })
 
+# Review configs, built once: mutation tools allow approve/edit/reject, anything
+# else that still reaches the approval prompt gets approve/reject. The same
+# read-only objects feed the HITL middleware's interrupt_on and the prompt.
+_MUTATION_REVIEW = {"allowed_decisions": ["approve", "edit", "reject"]}
+_DEFAULT_REVIEW = {"allowed_decisions": ["approve", "reject"]}
+REVIEW_CONFIG_MAP: Mapping[str, dict] = MappingProxyType(dict.fromkeys(MUTATION_TOOLS, _MUTATION_REVIEW))
+
+
+@lru_cache(maxsize=8)
+def _build_interrupt_on(tool_names: tuple[str, ...]) -> dict[str, dict | bool]:
+    """HITL map for a tool set: mutation tools need approval, everything else runs freely.
+
+    Cached per tool-name tuple, so rebuilding the agent over the same (pooled)
+    tools reuses one map. Callers must treat it as read-only.
+    """
+    return {name: REVIEW_CONFIG_MAP.get(name, False) for name in tool_names}
+
+
+# ---------------------------------------------------------------------------
+# MCP browser pool
+# ---------------------------------------------------------------------------
+
+# Pool sizing, per headless mode; the idle timeout is in seconds
+PW_POOL_MIN_SIZE = int(os.environ.get("PW_POOL_MIN_SIZE", "1"))
+PW_POOL_MAX_SIZE = int(os.environ.get("PW_POOL_MAX_SIZE", "3"))
+PW_POOL_IDLE_TIMEOUT = float(os.environ.get("PW_POOL_IDLE_TIMEOUT", "60"))
+_POOL_HEALTH_INTERVAL = 30.0   # seconds between health checks of idle sessions
+_POOL_PING_TIMEOUT = 5.0
+_POOL_RESET_TIMEOUT = 10.0
+
+# Optional Playwright storageState JSON (cookies + localStorage) loaded into every
+# fresh browser context, so auth-heavy tests can skip the login steps
+PW_STORAGE_STATE = os.environ.get("PW_STORAGE_STATE")
+
+
+@dataclass(eq=False)
+class MCPLease:
+    """One Playwright MCP session (npx server + Chromium) and the tools bound to it."""
+    headless: bool
+    client: Any
+    session: Any = None
+    tools: list = field(default_factory=list)
+    last_used: float = 0.0
+    closed: asyncio.Event = field(default_factory=asyncio.Event)
+    task: asyncio.Task | None = None
+
+
+class MCPBrowserPool:
+    """Keeps Playwright MCP sessions warm so repeated runs in one process skip
+    the npx + Chromium startup.
+
+    Sessions are pooled per headless mode, the only launch option that varies.
+    Each server runs with --isolated: one Chromium hosts an in-memory
+    BrowserContext per run, and release() closes that context, so the next
+    run gets fresh cookies/storage without paying for a new browser.
+    Each session is held open by its own owner task, because the MCP stdio
+    context must be entered and exited in the same task.
+    """
+
+    def __init__(self, min_size: int, max_size: int, idle_timeout: float):
+        self.min_size = min_size
+        self.max_size = max(max_size, 1)
+        self.idle_timeout = idle_timeout
+        self._idle: dict[bool, asyncio.Queue[MCPLease]] = {}
+        self._live: dict[bool, int] = {}
+        self._health_task: asyncio.Task | None = None
+        self._warm_tasks: set[asyncio.Task] = set()
+
+    async def acquire(self, headless: bool) -> MCPLease:
+        """Check out a live session, starting one if the pool has room, else waiting for a release."""
+        if self._health_task is None or self._health_task.done():
+            self._health_task = asyncio.create_task(self._health_check())
+
+        idle = self._idle.get(headless)
+        if idle is None:
+            idle = self._idle[headless] = asyncio.Queue()
+            # First use of this mode: bring it up to min_size in the background
+            warm = asyncio.create_task(self._top_up(headless))
+            self._warm_tasks.add(warm)
+            warm.add_done_callback(self._warm_tasks.discard)
+        while True:
+            if idle.empty() and self._live.get(headless, 0) < self.max_size:
+                return await self._open(headless)
+            lease = await idle.get()
+            if await self._is_alive(lease):
+                return lease
+            await self._close(lease)
+
+    async def release(self, lease: MCPLease) -> None:
+        """Return *lease* to the pool, closing its browser context so the next run starts clean."""
+        if not await self._reset_context(lease):
+            await self._close(lease)
+            return
+        lease.last_used = time.monotonic()
+        self._idle.setdefault(lease.headless, asyncio.Queue()).put_nowait(lease)
+
+    async def aclose(self) -> None:
+        """Stop the health check and pre-warming, and shut down every idle session."""
+        if self._health_task is not None:
+            self._health_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._health_task
+            self._health_task = None
+        for warm in list(self._warm_tasks):
+            warm.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await warm
+        for idle in self._idle.values():
+            while not idle.empty():
+                await self._close(idle.get_nowait())
+
+    async def _open(self, headless: bool) -> MCPLease:
+        from langchain_mcp_adapters.client import MultiServerMCPClient
+
+        mcp_args = [
+            "@playwright/mcp@latest", "--isolated",
+            "--save-video", "1280x720", "--output-dir", str(RUNS_DIR / "videos"),
+        ]
+        if headless:
+            mcp_args.append("--headless")
+        if PW_STORAGE_STATE:
+            mcp_args += ["--storage-state", PW_STORAGE_STATE]
+
+        lease = MCPLease(
+            headless=headless,
+            client=MultiServerMCPClient({
+                "playwright": {
+                    "command": "npx",
+                    "args": mcp_args,
+                    "transport": "stdio",
+                }
+            }),
+        )
+        self._live[headless] = self._live.get(headless, 0) + 1
+        ready = asyncio.get_running_loop().create_future()
+        lease.task = asyncio.create_task(self._hold_session(lease, ready))
+        try:
+            await ready
+        except BaseException:
+            self._live[headless] -= 1
+            lease.closed.set()
+            raise
+        return lease
+
+    @staticmethod
+    async def _hold_session(lease: MCPLease, ready: asyncio.Future) -> None:
+        """Owner task: open the MCP session, load its tools, and keep it open until closed."""
+        from langchain_mcp_adapters.tools import load_mcp_tools
+
+        try:
+            async with lease.client.session("playwright") as session:
+                lease.session = session
+                lease.tools = await load_mcp_tools(session)
+                ready.set_result(None)
+                await lease.closed.wait()
+        except Exception as exc:
+            if not ready.done():
+                ready.set_exception(exc)
+        finally:
+            if not ready.done():
+                ready.cancel()
+            lease.closed.set()  # a session that dies on its own fails the next liveness check
+
+    async def _is_alive(self, lease: MCPLease) -> bool:
+        if lease.closed.is_set():
+            return False
+        try:
+            await asyncio.wait_for(lease.session.send_ping(), timeout=_POOL_PING_TIMEOUT)
+        except Exception:
+            return False
+        return True
+
+    async def _reset_context(self, lease: MCPLease) -> bool:
+        """Close the session's current BrowserContext; the server opens a new one on next use."""
+        if lease.closed.is_set():
+            return False
+        try:
+            await asyncio.wait_for(
+                lease.session.call_tool("browser_close", {}), timeout=_POOL_RESET_TIMEOUT,
+            )
+        except Exception:
+            return False
+        return True
+
+    async def _close(self, lease: MCPLease) -> None:
+        self._live[lease.headless] -= 1
+        lease.closed.set()
+        if lease.task is not None:
+            with contextlib.suppress(Exception):
+                await lease.task
+
+    async def _top_up(self, headless: bool) -> None:
+        """Open idle sessions until *headless* mode has min_size live ones (best effort)."""
+        while self._live.get(headless, 0) < min(self.min_size, self.max_size):
+            try:
+                lease = await self._open(headless)
+            except Exception as exc:
+                console.print(f"[dim]MCP pool: could not pre-warm a session ({exc})[/]")
+                return
+            lease.last_used = time.monotonic()
+            self._idle[headless].put_nowait(lease)
+
+    async def _health_check(self) -> None:
+        """Periodically evict idle sessions that are dead or idle past the timeout,
+        then top each mode back up to min_size."""
+        while True:
+            await asyncio.sleep(_POOL_HEALTH_INTERVAL)
+            now = time.monotonic()
+            # Snapshot: acquire() may add a mode while this loop awaits
+            for headless, idle in list(self._idle.items()):
+                pending = [idle.get_nowait() for _ in range(idle.qsize())]
+                try:
+                    while pending:
+                        lease = pending[0]
+                        expired = (
+                            now - lease.last_used > self.idle_timeout
+                            and self._live[headless] > self.min_size
+                        )
+                        if expired or not await self._is_alive(lease):
+                            pending.pop(0)
+                            await self._close(lease)
+                        else:
+                            idle.put_nowait(pending.pop(0))
+                finally:
+                    # Cancelled mid-check (aclose): unchecked sessions go back to the pool
+                    for lease in pending:
+                        idle.put_nowait(lease)
+                await self._top_up(headless)
+
+
+_POOL = MCPBrowserPool(PW_POOL_MIN_SIZE, PW_POOL_MAX_SIZE, PW_POOL_IDLE_TIMEOUT)
+
 
 # ---------------------------------------------------------------------------
 # Chat history saver (same pattern as other agents)
 # ---------------------------------------------------------------------------
 
+def _truncate(text: str, limit: int, suffix: str = "…") -> str:
+    """Cut *text* to *limit* characters, marking the cut with *suffix*."""
+    return text if len(text) <= limit else text[:limit] + suffix
+
+
+def _content_text(content: Any) -> str:
+    """Text of a message's content — a plain string, or the text blocks of a content-block list."""
+    if isinstance(content, list):
+        return "\n".join(
+            p.get("text", "")
+            for p in content
+            if isinstance(p, dict) and p.get("type") == "text"
+        )
+    return str(content)
+
+
+def _spill_info(msg: "ToolMessage") -> dict | None:
+    """The TruncatingToolMiddleware marker on a tool result ({"size", "path", ...}), if it was spilled."""
+    from middleware import TRUNCATED_KEY  # imported here: middleware pulls in langchain
+
+    return msg.additional_kwargs.get(TRUNCATED_KEY)
+
+
+def _fmt_args(args: dict, indent: bool = False) -> str:
+    """Tool-call args as JSON — unlike str(dict), the HITL edit prompt can parse it back."""
+    if orjson is not None:
+        return orjson.dumps(args, option=orjson.OPT_INDENT_2 if indent else 0, default=str).decode()
+    return json.dumps(args, indent=2 if indent else None, default=str, ensure_ascii=False)
+
+
+def _parse_args(text: str) -> Any:
+    """Parse JSON produced by _fmt_args (or edited by the user). Raises ValueError on bad JSON."""
+    return orjson.loads(text) if orjson is not None else json.loads(text)
+
+
+def _lookup_renderer(table: dict[type | str, Callable], cls: type) -> Callable | None:
+    """Renderer for message class *cls*: an exact-type dict hit on the hot path.
+
+    Tables are seeded by class name so this module need not import
+    langchain_core. The first lookup of a class walks its MRO by name — so
+    subclasses such as AIMessageChunk resolve too — and caches the result
+    under the class itself; unknown types are cached as None.
+    """
+    try:
+        return table[cls]
+    except KeyError:
+        renderer = next((table[base.__name__] for base in cls.__mro__ if base.__name__ in table), None)
+        table[cls] = renderer
+        return renderer
+
+
+def _render_human(msg: "HumanMessage", line: Callable[..., None]) -> None:
+    line("[USER]")
+    line(_content_text(msg.content))
+    line()
+
+
+def _render_ai(msg: "AIMessage", line: Callable[..., None]) -> None:
+    content = _content_text(msg.content)
+    line("[AGENT]")
+    if content and content.strip():
+        line(content.strip())
+    if msg.tool_calls:
+        for tc in msg.tool_calls:
+            name = tc.get("name", "unknown")
+            args = tc.get("args", {})
+            line(f"  >> Tool call: {name}")
+            line(f"     Args: {_truncate(_fmt_args(args), 500, '...')}")
+    line()
+
+
+def _render_tool(msg: "ToolMessage", line: Callable[..., None]) -> None:
+    name = getattr(msg, "name", "tool")
+    line(f"[TOOL RESULT: {name}]")
+    line(_truncate(_content_text(msg.content), 2000, "\n... (truncated)"))
+    if spilled := _spill_info(msg):
+        line(f"     Full output ({spilled['size']:,} chars): {spilled['path']}")
+    line()
+
+
+# Chat-history renderers, keyed by message type (see _lookup_renderer)
+_RENDERERS: dict[type | str, Callable] = {
+    "HumanMessage": _render_human,
+    "AIMessage": _render_ai,
+    "ToolMessage": _render_tool,
+}
+
+
 def save_chat_history(messages: list, testcase: str, output_path: str | None = None) -> Path:
-    """Save all agent messages to a formatted txt file."""
+    """Save all agent messages to a formatted txt file.
+
+    Lines are streamed straight to the file rather than collected and joined,
+    so a long run is never held in memory twice. Async callers should run it
+    via asyncio.to_thread() to keep the write off the event loop.
+    """
     if output_path:
         filepath = Path(output_path)
         filepath.parent.mkdir(parents=True, exist_ok=True)
     else:
         RUNS_DIR.mkdir(exist_ok=True)
-        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        slug = re.sub(r"[^a-z0-9]+", "-", testcase.lower())[:40].strip("-")
+        timestamp = datetime.now().strftime(_TIMESTAMP_FMT)
+        slug = _SLUG_RE.sub("-", testcase.lower())[:40].strip("-")
         filepath = RUNS_DIR / f"{timestamp}_{slug}.txt"
 
-    lines: list[str] = []
-    lines.append(f"Test Case : {testcase}")
-    lines.append(f"Timestamp : {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    lines.append("=" * 80)
-    lines.append("")
-
-    for msg in messages:
-        if isinstance(msg, HumanMessage):
-            lines.append("[USER]")
-            lines.append(str(msg.content))
-            lines.append("")
-        elif isinstance(msg, AIMessage):
-            content = msg.content
-            if isinstance(content, list):
-                text_parts = [
-                    p.get("text", "")
-                    for p in content
-                    if isinstance(p, dict) and p.get("type") == "text"
-                ]
-                content = "\n".join(text_parts)
-            lines.append("[AGENT]")
-            if content and content.strip():
-                lines.append(content.strip())
-            if msg.tool_calls:
-                for tc in msg.tool_calls:
-                    name = tc.get("name", "unknown")
-                    args = tc.get("args", {})
-                    lines.append(f"  >> Tool call: {name}")
-                    args_str = str(args)
-                    if len(args_str) > 500:
-                        args_str = args_str[:500] + "..."
-                    lines.append(f"     Args: {args_str}")
-            lines.append("")
-        elif isinstance(msg, ToolMessage):
-            name = getattr(msg, "name", "tool")
-            lines.append(f"[TOOL RESULT: {name}]")
-            content = str(msg.content)
-            if len(content) > 2000:
-                content = content[:2000] + "\n... (truncated)"
-            lines.append(content)
-            lines.append("")
-
-    filepath.write_text("\n".join(lines), encoding="utf-8")
+    with filepath.open("w", encoding="utf-8") as f:
+        def line(text: str = "") -> None:
+            f.write(text)
+            f.write("\n")
+
+        line(f"Test Case : {testcase}")
+        line(f"Timestamp : {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        line("=" * 80)
+        line()
+
+        for msg in messages:
+            if renderer := _lookup_renderer(_RENDERERS, type(msg)):
+                renderer(msg, line)
+
     return filepath
 
 
@@ -180,25 +501,73 @@ def save_chat_history(messages: list, testcase: str, output_path: str | None = N
 # HITL display & prompt
 # ---------------------------------------------------------------------------
 
-def display_interrupt_and_get_decisions(interrupt_data) -> list[dict]:
-    """Show pending tool calls to the human and collect approve/reject/edit decisions."""
-    interrupts = interrupt_data[0].value
-    action_requests = interrupts["action_requests"]
-    review_configs = interrupts["review_configs"]
-    config_map = {cfg["action_name"]: cfg for cfg in review_configs}
+def _edit_in_editor(text: str) -> str | None:
+    """Open *text* in $VISUAL / $EDITOR and return the saved file.
+
+    None when no editor is configured, it cannot be started, or it exits
+    non-zero — the caller then falls back to the inline prompt.
+    """
+    editor = os.environ.get("VISUAL") or os.environ.get("EDITOR")
+    if not editor:
+        return None
+    fd, path = tempfile.mkstemp(prefix="pw-args-", suffix=".json")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        if subprocess.run([*shlex.split(editor), path]).returncode != 0:
+            return None
+        return Path(path).read_text(encoding="utf-8")
+    except OSError:
+        return None
+    finally:
+        with contextlib.suppress(OSError):
+            os.unlink(path)
+
+
+def _edit_args(args: dict) -> dict:
+    """Let the human edit tool-call args as one JSON object — in their editor when set.
+
+    JSON keeps value types, so no per-key type guessing is needed.
+    """
+    edited = _edit_in_editor(_fmt_args(args, indent=True))
+    while True:
+        if edited is None:
+            console.print("  [dim]Edit the arguments as a JSON object.[/]")
+            edited = Prompt.ask("    args", default=_fmt_args(args))
+        try:
+            parsed = _parse_args(edited)
+        except ValueError as exc:
+            console.print(f"  [red]Invalid JSON: {escape(str(exc))}[/]")
+        else:
+            if isinstance(parsed, dict):
+                return parsed
+            console.print("  [red]Arguments must be a JSON object.[/]")
+        edited = None
+
+
+def display_interrupt_and_get_decisions(
+    interrupt_data,
+    config_map: Mapping[str, dict] = REVIEW_CONFIG_MAP,
+) -> list[dict]:
+    """Show pending tool calls to the human and collect approve/reject/edit decisions.
+
+    *config_map* maps tool names to their review config; the default is the
+    prebuilt map the agent's interrupt_on was derived from.
+    """
+    action_requests = interrupt_data[0].value["action_requests"]
 
     decisions = []
 
     for i, action in enumerate(action_requests):
         name = action["name"]
         args = action["args"]
-        review_config = config_map.get(name, {"allowed_decisions": ["approve", "reject"]})
+        review_config = config_map.get(name, _DEFAULT_REVIEW)
         allowed = review_config["allowed_decisions"]
 
         # Display the proposed action
         console.print()
         console.print(Panel.fit(
-            f"[bold]{name}[/bold]\n" + "\n".join(f"  {k}: {v}" for k, v in args.items()),
+            f"[bold]{name}[/bold]\n" + escape(_fmt_args(args, indent=True)),
             title=f"[yellow]⚠ Action {i+1}/{len(action_requests)} Needs Approval[/]",
             border_style="yellow",
         ))
@@ -214,24 +583,9 @@ def display_interrupt_and_get_decisions(interrupt_data) -> list[dict]:
                 default="approve" if "approve" in allowed else allowed[0],
             )
             if choice == "edit" and "edit" in allowed:
-                console.print("  [dim]Edit the arguments (JSON-like, one per line).[/]")
-                console.print(f"  [dim]Current: {args}[/]")
-                edited_args = {}
-                for key, val in args.items():
-                    new_val = Prompt.ask(f"    {key}", default=str(val))
-                    # Try to preserve types
-                    if isinstance(val, bool):
-                        edited_args[key] = new_val.lower() in ("true", "1", "yes")
-                    elif isinstance(val, int):
-                        try:
-                            edited_args[key] = int(new_val)
-                        except ValueError:
-                            edited_args[key] = new_val
-                    else:
-                        edited_args[key] = new_val
                 decisions.append({
                     "type": "edit",
-                    "edited_action": {"name": name, "args": edited_args},
+                    "edited_action": {"name": name, "args": _edit_args(args)},
                 })
                 break
             elif choice == "approve":
@@ -251,59 +605,135 @@ def display_interrupt_and_get_decisions(interrupt_data) -> list[dict]:
 class AgentDisplay:
     """Formats agent messages for terminal output."""
 
+    # How many recent agent-text panels are remembered for repeat detection
+    _REPEAT_WINDOW = 128
+
     def __init__(self):
-        self.printed_count = 0
+        self.messages: list = []                 # latest full message list seen in the stream
+        self._printed: set[str | int] = set()   # ids of messages already rendered
+        self._recent: deque[int] = deque(maxlen=self._REPEAT_WINDOW)  # hashes of recent panels
+        self._recent_set: set[int] = set()      # same hashes, for O(1) membership
         self.spinner = Spinner("dots", text="Executing test…")
 
+    @staticmethod
+    def _message_key(msg: Any) -> str | int:
+        return getattr(msg, "id", None) or id(msg)
+
+    def take_new(self, msgs: list) -> list:
+        """Return the messages in *msgs* that have not been printed yet, marking them printed.
+
+        New messages are only appended, so the scan walks back from the end and
+        stops at the first message already seen — O(new) per streamed chunk
+        instead of re-walking the whole history.
+        """
+        new: list = []
+        for msg in reversed(msgs):
+            if self._message_key(msg) in self._printed:
+                break
+            new.append(msg)
+        new.reverse()
+        self._printed.update(map(self._message_key, new))
+        return new
+
+    def _is_repeat(self, content: str) -> bool:
+        """True if *content* matches a recent panel; otherwise remember it and return False."""
+        h = hash(content)
+        if h in self._recent_set:
+            return True
+        if len(self._recent) == self._recent.maxlen:
+            self._recent_set.discard(self._recent[0])
+        self._recent.append(h)
+        self._recent_set.add(h)
+        return False
+
     def _update_spinner(self, text: str):
         self.spinner = Spinner("dots", text=text[:60])
 
     def print_message(self, msg: Any) -> None:
-        if isinstance(msg, HumanMessage):
-            content = str(msg.content)
-            if len(content) > 200:
-                content = content[:200] + "…"
-            console.print(Panel(content, title="Input", border_style="blue"))
-
-        elif isinstance(msg, AIMessage):
-            content = msg.content
-            if isinstance(content, list):
-                content = "\n".join(
-                    p.get("text", "") for p in content
-                    if isinstance(p, dict) and p.get("type") == "text"
-                )
-            if content and content.strip():
+        if printer := _lookup_renderer(self._PRINTERS, type(msg)):
+            printer(self, msg)
+
+    def _print_human(self, msg: "HumanMessage") -> None:
+        content = _truncate(_content_text(msg.content), 200)
+        console.print(Panel(content, title="Input", border_style="blue"))
+
+    def _print_ai(self, msg: "AIMessage") -> None:
+        content = _content_text(msg.content)
+        if content and content.strip():
+            # Retries often repeat the same text; skip re-parsing it as Markdown
+            if self._is_repeat(content):
+                console.print("[dim](repeat)[/]")
+            else:
                 console.print(
-                    Panel(Markdown(str(content)), title="Playwright Agent", border_style="magenta")
+                    Panel(Markdown(content), title="Playwright Agent", border_style="magenta")
                 )
-            if msg.tool_calls:
-                for tc in msg.tool_calls:
-                    name = tc.get("name", "")
-                    args = tc.get("args", {})
-                    # Color-code by safety
-                    if name in MUTATION_TOOLS:
-                        label = f"[bold yellow]⚠ {name}[/]"
-                    else:
-                        label = f"[bold cyan]{name}[/]"
-                    args_short = str(args)
-                    if len(args_short) > 80:
-                        args_short = args_short[:80] + "…"
-                    console.print(f"  >> {label}: {args_short}")
-                    self._update_spinner(f"{name}")
+        if msg.tool_calls:
+            for tc in msg.tool_calls:
+                name = tc.get("name", "")
+                args = tc.get("args", {})
+                # Color-code by safety
+                if name in MUTATION_TOOLS:
+                    label = f"[bold yellow]⚠ {name}[/]"
+                else:
+                    label = f"[bold cyan]{name}[/]"
+                console.print(f"  >> {label}: {_truncate(_fmt_args(args), 80)}")
+                self._update_spinner(f"{name}")
+
+    def _print_tool(self, msg: "ToolMessage") -> None:
+        if spilled := _spill_info(msg):
+            console.print(
+                f"  [dim]<< {escape(msg.name or 'tool')}: {spilled['size']:,} chars "
+                f"→ {escape(spilled['path'])}[/]"
+            )
+
+    # Console printers, keyed by message type (see _lookup_renderer)
+    _PRINTERS: dict[type | str, Callable] = {
+        "HumanMessage": _print_human,
+        "AIMessage": _print_ai,
+        "ToolMessage": _print_tool,
+    }
 
 
 # ---------------------------------------------------------------------------
 # Input collection
 # ---------------------------------------------------------------------------
 
+# Piped stdin, read whole on first use and handed out line by line (see collect_multiline_input)
+_PIPED_LINES: deque[str] | None = None
+
+
+def _next_input_line() -> str:
+    """The next line of input, like input(). Raises EOFError at end of input.
+
+    Piped stdin (``cat plan.md | python playwright.py ...``) is read in one
+    call instead of one input() per line.
+    """
+    global _PIPED_LINES
+    if sys.stdin.isatty():
+        return input()
+    if _PIPED_LINES is None:
+        text = sys.stdin.read()
+        _PIPED_LINES = deque(text.split("\n"))
+        if text.endswith("\n") or not text:
+            _PIPED_LINES.pop()  # nothing follows the final newline
+    if not _PIPED_LINES:
+        raise EOFError
+    return _PIPED_LINES.popleft()
+
+
 def collect_multiline_input(prompt_text: str) -> str:
-    """Collect multi-line input from the user. Empty line to finish."""
-    console.print(f"\n[bold]{prompt_text}[/]")
-    console.print("[dim](Paste content, then press Enter on an empty line to finish)[/]")
+    """Collect multi-line input from the user. Empty line to finish.
+
+    Piped stdin works the same way: blank-line-separated sections feed
+    successive prompts.
+    """
+    if sys.stdin.isatty():
+        console.print(f"\n[bold]{prompt_text}[/]")
+        console.print("[dim](Paste content, then press Enter on an empty line to finish)[/]")
     lines = []
     while True:
         try:
-            line = input()
+            line = _next_input_line()
         except EOFError:
             break
         if line == "" and lines:
@@ -316,17 +746,108 @@ def collect_multiline_input(prompt_text: str) -> str:
 # Agent factory
 # ---------------------------------------------------------------------------
 
+@contextlib.asynccontextmanager
+async def open_checkpointer():
+    """Yield the agent checkpointer (required for HITL).
+
+    Checkpoints go to CHECKPOINT_DB through langgraph's AsyncSqliteSaver, so
+    long runs keep their history on disk instead of in the Python heap and an
+    interrupted run can be picked up again with --resume. Falls back to the
+    in-memory MemorySaver when langgraph-checkpoint-sqlite is not installed
+    (main() refuses --resume in that case, see _persistent_checkpoints).
+    """
+    try:
+        from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+    except ImportError:
+        from langgraph.checkpoint.memory import MemorySaver
+
+        yield MemorySaver()
+        return
+
+    RUNS_DIR.mkdir(exist_ok=True)
+    async with AsyncSqliteSaver.from_conn_string(str(CHECKPOINT_DB)) as saver:
+        yield saver
+
+
+def _persistent_checkpoints() -> bool:
+    """Whether open_checkpointer() can persist checkpoints across processes."""
+    import importlib.util
+
+    try:
+        return importlib.util.find_spec("langgraph.checkpoint.sqlite.aio") is not None
+    except ImportError:
+        return False
+
+
+def _run_unfinished(state) -> bool:
+    """Whether a thread's checkpointed state is a run that stopped part-way.
+
+    True when nodes are still scheduled or a HITL interrupt is pending; a run
+    that finished has neither, even though its messages are still there.
+    """
+    return bool(state.next) or any(getattr(task, "interrupts", None) for task in state.tasks)
+
+
 async def create_playwright_agent(
     headless: bool = True,
     model_id: str | None = None,
+    checkpointer=None,
 ):
     """Create the Playwright IFT agent with MCP tools and HITL.
 
-    Returns (agent, mcp_client, session) — caller must manage the session lifetime.
+    Returns (agent, lease) — the browser session comes from the shared pool and
+    the caller must hand it back with ``await _POOL.release(lease)``.
+    Without a *checkpointer* (see open_checkpointer) an in-memory one is used.
     """
-    from langchain_mcp_adapters.tools import load_mcp_tools
-    from langchain_mcp_adapters.client import MultiServerMCPClient
+    # --- MCP session (warm from the pool when available — browser stays alive) ---
+    # A cold session spawns the MCP server and lists its tools; the agent stack
+    # is imported in a worker thread meanwhile, so the two startup costs overlap.
+    lease, imported = await asyncio.gather(
+        _POOL.acquire(headless),
+        asyncio.to_thread(_import_agent_stack),
+        return_exceptions=True,
+    )
+    if isinstance(lease, BaseException):
+        raise lease
+    try:
+        if isinstance(imported, BaseException):
+            raise imported
+        return _build_agent(lease, model_id, checkpointer), lease
+    except BaseException:
+        await _POOL.release(lease)
+        raise
+
+
+def _import_agent_stack() -> None:
+    """Import everything _build_agent needs, so its own imports are cache hits."""
+    import backends                                   # noqa: F401
+    import deepagents                                 # noqa: F401
+    import langchain.agents.middleware.tool_retry     # noqa: F401
+    import langchain_openrouter                       # noqa: F401
+    import langgraph.checkpoint.memory                # noqa: F401
+    import middleware                                 # noqa: F401
+    import tools                                      # noqa: F401
+
+
+@lru_cache(maxsize=1)
+def _agent_backend():
+    """The filesystem backend, shared across agent builds so its file cache persists."""
+    from backends import CachedFilesystemBackend
+
+    return CachedFilesystemBackend(root_dir=str(PLAYWRIGHT_DIR), virtual_mode=True)
+
+
+def _build_agent(lease: MCPLease, model_id: str | None, checkpointer):
+    """Assemble the deep agent around a leased MCP session (see create_playwright_agent)."""
+    from deepagents import create_deep_agent
+    from langchain.agents.middleware import ModelRetryMiddleware
+    from langchain.agents.middleware.tool_retry import ToolRetryMiddleware
     from langchain_openrouter import ChatOpenRouter
+    from langgraph.checkpoint.memory import MemorySaver
+
+    from middleware import TruncatingToolMiddleware
+    # Custom Postman/SOAP tools (read-only)
+    from tools import ALL_TOOLS as CUSTOM_TOOLS
 
     _model_id = model_id or os.environ.get(
         "PLAYWRIGHT_AGENT_MODEL", "arcee-ai/trinity-large-preview:free"
@@ -335,39 +856,18 @@ async def create_playwright_agent(
         model=_model_id, temperature=0.5, max_tokens=8192, presence_penalty=0.3
     )
 
-    # --- MCP client ---
-    mcp_args = ["@playwright/mcp@latest", "--save-video", "1280x720", "--output-dir", str(RUNS_DIR / "videos")]
-    if headless:
-        mcp_args.append("--headless")
-
-    mcp_client = MultiServerMCPClient({
-        "playwright": {
-            "command": "npx",
-            "args": mcp_args,
-            "transport": "stdio",
-        }
-    })
-
-    # Start the MCP session (persistent — browser stays alive)
-    session = mcp_client.session("playwright")
-    session_ctx = await session.__aenter__()
-    playwright_tools = await load_mcp_tools(session_ctx)
+    playwright_tools = lease.tools
 
     # Combine MCP tools with custom Postman tools
     all_tools = playwright_tools + CUSTOM_TOOLS
     console.print(f"[dim]Loaded {len(playwright_tools)} MCP tools + {len(CUSTOM_TOOLS)} custom tools[/]")
 
     # --- Build interrupt_on map from discovered tools ---
-    interrupt_on = {}
-    for t in all_tools:
-        name = t.name
-        if name in MUTATION_TOOLS:
-            interrupt_on[name] = {"allowed_decisions": ["approve", "edit", "reject"]}
-        else:
-            interrupt_on[name] = False
+    interrupt_on = _build_interrupt_on(tuple(t.name for t in all_tools))
 
     # --- Checkpointer (required for HITL) ---
-    checkpointer = MemorySaver()
+    if checkpointer is None:
+        checkpointer = MemorySaver()
 
     # --- Middleware ---
     model_retry = ModelRetryMiddleware(
@@ -376,9 +876,13 @@ async def create_playwright_agent(
     tool_retry = ToolRetryMiddleware(
         max_retries=3, backoff_factor=2.0, initial_delay=1.0,
     )
+    # Inside the retry layer, so only the final result of a call is spilled
+    truncate_results = TruncatingToolMiddleware(
+        ARTIFACTS_DIR, "/runs/artifacts", max_chars=PW_TOOL_RESULT_MAX_CHARS,
+    )
 
     # --- Create the deep agent ---
-    agent = create_deep_agent(
+    return create_deep_agent(
         model=model,
         name="playwright-agent",
         memory=["./AGENTS.md"],
@@ -386,112 +890,133 @@ async def create_playwright_agent(
         tools=all_tools,
         interrupt_on=interrupt_on,
         checkpointer=checkpointer,
-        middleware=[model_retry, tool_retry],
-        backend=FilesystemBackend(root_dir=str(PLAYWRIGHT_DIR), virtual_mode=True),
+        middleware=[model_retry, tool_retry, truncate_results],
+        backend=_agent_backend(),
     )
 
-    return agent, mcp_client, session, session_ctx
-
 
 # ---------------------------------------------------------------------------
 # Main execution loop with HITL
 # ---------------------------------------------------------------------------
 
+# Render batching: queued messages are printed once this many are pending, or
+# once the oldest has waited this long — whichever comes first
+_RENDER_BATCH_SIZE = 8
+_RENDER_BATCH_SECONDS = 0.05
+
+_STREAM_END = object()
+
+
+async def _pump_stream(stream, queue: asyncio.Queue) -> None:
+    """Forward every chunk of *stream* into *queue*, then the _STREAM_END sentinel."""
+    try:
+        async for chunk in stream:
+            queue.put_nowait(chunk)
+    finally:
+        queue.put_nowait(_STREAM_END)
+
+
+async def _stream_and_render(agent, input_payload, config: dict, display: AgentDisplay) -> None:
+    """Stream one agent run (initial input or a resume Command) and render its new messages.
+
+    Chunks are consumed from a queue so rendering can be batched: the Live
+    spinner is stopped and restarted once per batch rather than once per
+    chunk, and a timeout flushes a partial batch so nothing waits on the
+    next chunk. The latest message list is kept in display.messages.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    producer = asyncio.create_task(_pump_stream(
+        agent.astream(input_payload, config=config, stream_mode="values"), queue,
+    ))
+    pending: list = []
+    first_pending_at = 0.0
+
+    with Live(display.spinner, console=console, refresh_per_second=10, transient=True) as live:
+        def flush() -> None:
+            if pending:
+                live.stop()
+                for msg in pending:
+                    display.print_message(msg)
+                pending.clear()
+                live.start()
+                live.update(display.spinner)
+
+        try:
+            while True:
+                timeout = None
+                if pending:
+                    timeout = max(0.0, first_pending_at + _RENDER_BATCH_SECONDS - time.monotonic())
+                try:
+                    chunk = await asyncio.wait_for(queue.get(), timeout)
+                except TimeoutError:
+                    flush()
+                    continue
+                if chunk is _STREAM_END:
+                    break
+                if "messages" not in chunk:
+                    continue
+
+                display.messages = chunk["messages"]
+                new_msgs = display.take_new(display.messages)
+                if new_msgs and not pending:
+                    first_pending_at = time.monotonic()
+                pending.extend(new_msgs)
+                if len(pending) >= _RENDER_BATCH_SIZE:
+                    flush()
+            flush()
+            await producer  # re-raise anything the stream raised
+        finally:
+            producer.cancel()
+
+
 async def run_test_with_hitl(
     agent,
-    messages: list[tuple[str, str]],
+    messages: list | None,
     config: dict,
     display: AgentDisplay,
     no_save: bool = False,
     output_path: str | None = None,
     testcase_title: str = "test",
 ) -> dict:
-    """Run the agent in a loop, handling HITL interrupts."""
+    """Run the agent in a loop, handling HITL interrupts.
+
+    With messages=None the run continues from the thread's last checkpoint.
+    """
+    from langgraph.types import Command
 
-    all_messages: list = []
-    input_payload = {"messages": messages}
-    is_resume = False
+    input_payload = {"messages": messages} if messages is not None else None
 
     try:
+        # Stream, then either finish or collect HITL decisions and stream the resume
         while True:
-            if is_resume:
-                # We're resuming after an interrupt — decisions already set
-                pass
-            else:
-                # Normal invocation or first call
-                with Live(display.spinner, console=console, refresh_per_second=10, transient=True) as live:
-                    async for chunk in agent.astream(
-                        input_payload,
-                        config=config,
-                        stream_mode="values",
-                    ):
-                        if "messages" in chunk:
-                            msgs = chunk["messages"]
-                            all_messages = msgs
-                            new_msgs = msgs[display.printed_count:]
-                            if new_msgs:
-                                live.stop()
-                                for msg in new_msgs:
-                                    display.print_message(msg)
-                                display.printed_count = len(msgs)
-                                live.start()
-                                live.update(display.spinner)
-
-            # After streaming, check the final state for interrupts
-            state = await agent.aget_state(config)
+            await _stream_and_render(agent, input_payload, config, display)
 
-            if not state.tasks:
-                # No pending tasks = agent finished
+            state = await agent.aget_state(config)
+            interrupts = next(
+                (task.interrupts for task in state.tasks if getattr(task, "interrupts", None)),
+                None,
+            )
+            if not interrupts:
+                # No pending interrupt = agent finished
                 break
 
-            # Check for interrupts in pending tasks
-            has_interrupt = False
-            for task in state.tasks:
-                if hasattr(task, 'interrupts') and task.interrupts:
-                    has_interrupt = True
-                    console.print()
-                    console.print("[bold yellow]═══ Human-in-the-Loop ═══[/]")
-                    decisions = display_interrupt_and_get_decisions(task.interrupts)
-                    console.print("[bold green]Resuming...[/]")
-
-                    # Resume with decisions
-                    input_payload = Command(resume={"decisions": decisions})
-                    is_resume = True
-
-                    # Stream the resumed execution
-                    with Live(display.spinner, console=console, refresh_per_second=10, transient=True) as live:
-                        async for chunk in agent.astream(
-                            input_payload,
-                            config=config,
-                            stream_mode="values",
-                        ):
-                            if "messages" in chunk:
-                                msgs = chunk["messages"]
-                                all_messages = msgs
-                                new_msgs = msgs[display.printed_count:]
-                                if new_msgs:
-                                    live.stop()
-                                    for msg in new_msgs:
-                                        display.print_message(msg)
-                                    display.printed_count = len(msgs)
-                                    live.start()
-                                    live.update(display.spinner)
-                    break  # Will loop back to check state again
-
-            if not has_interrupt:
-                break
+            console.print()
+            console.print("[bold yellow]═══ Human-in-the-Loop ═══[/]")
+            decisions = display_interrupt_and_get_decisions(interrupts)
+            console.print("[bold green]Resuming...[/]")
+            input_payload = Command(resume={"decisions": decisions})
 
         console.print()
         console.print("[bold green]✓ Test execution complete.[/]")
 
         # Save messages
-        if not no_save and all_messages:
-            saved_path = save_chat_history(
-                all_messages, testcase_title, output_path=output_path
+        if not no_save and display.messages:
+            saved_path = await asyncio.to_thread(
+                save_chat_history, display.messages, testcase_title, output_path=output_path
             )
             console.print(f"[dim]Messages saved to: {saved_path}[/]")
 
-        return {"messages": all_messages}
+        return {"messages": display.messages}
 
     except Exception as exc:
         console.print()
@@ -499,9 +1024,9 @@ async def run_test_with_hitl(
         console.print("[yellow]The model may have returned a malformed response. "
                       "Try again or use a different model with --model.[/]")
         # Still try to save what we have
-        if not no_save and all_messages:
-            saved_path = save_chat_history(
-                all_messages, testcase_title, output_path=output_path
+        if not no_save and display.messages:
+            saved_path = await asyncio.to_thread(
+                save_chat_history, display.messages, testcase_title, output_path=output_path
             )
             console.print(f"[dim]Partial messages saved to: {saved_path}[/]")
         raise
@@ -553,37 +1078,40 @@ Examples:
                         help="Save the full message log to FILE")
     parser.add_argument("--no-save", action="store_true",
                         help="Do not save messages to a file after the run")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue this test case's interrupted run from its checkpoint "
+                             "instead of starting over")
     args = parser.parse_args()
 
     # Change working directory so relative paths in create_deep_agent work
     os.chdir(PLAYWRIGHT_DIR)
 
     # --- List tools mode ---
+    # Only needs the MCP session and the custom tools — no model or agent graph
     if args.list_tools:
-        console.print("[bold blue]Loading Playwright MCP tools...[/]")
-        agent, mcp_client, session, session_ctx = await create_playwright_agent(
-            headless=True, model_id=args.model,
-        )
-        tools = agent.get_graph().nodes  # Just list what we loaded
-        console.print()
+        from tools import ALL_TOOLS as CUSTOM_TOOLS
 
-        table = Table(title="Playwright MCP Tools")
-        table.add_column("Tool", style="bold")
-        table.add_column("Category", style="dim")
-
-        for t in agent.tools if hasattr(agent, 'tools') else []:
-            name = t.name if hasattr(t, 'name') else str(t)
-            is_custom = name in {t.name for t in CUSTOM_TOOLS}
-            if name in MUTATION_TOOLS:
-                cat = "[yellow]⚠ MUTATION[/]"
-            elif is_custom:
-                cat = "[blue]CUSTOM[/]"
-            else:
-                cat = "[green]SAFE[/]"
-            table.add_row(name, cat)
-
-        console.print(table)
-        await session.__aexit__(None, None, None)
+        console.print("[bold blue]Loading Playwright MCP tools...[/]")
+        lease = await _POOL.acquire(headless=True)
+        try:
+            console.print()
+            table = Table(title="Playwright MCP Tools")
+            table.add_column("Tool", style="bold")
+            table.add_column("Category", style="dim")
+
+            custom_names = {t.name for t in CUSTOM_TOOLS}
+            for t in lease.tools + CUSTOM_TOOLS:
+                if t.name in MUTATION_TOOLS:
+                    cat = "[yellow]⚠ MUTATION[/]"
+                elif t.name in custom_names:
+                    cat = "[blue]CUSTOM[/]"
+                else:
+                    cat = "[green]SAFE[/]"
+                table.add_row(t.name, cat)
+
+            console.print(table)
+        finally:
+            await _POOL.release(lease)
         return
 
     # --- Require URL for test execution ---
@@ -591,9 +1119,15 @@ Examples:
         parser.print_help()
         return
 
+    if args.resume and not _persistent_checkpoints():
+        parser.error(
+            "--resume needs langgraph-checkpoint-sqlite to keep checkpoints between runs "
+            "(pip install langgraph-checkpoint-sqlite)"
+        )
+
     # --- Graph mode ---
     if args.graph:
-        agent, mcp_client, session, session_ctx = await create_playwright_agent(
+        agent, lease = await create_playwright_agent(
             headless=True, model_id=args.model,
         )
         try:
@@ -602,7 +1136,8 @@ Examples:
             console.print(Panel(mermaid_text, title="Agent Graph", border_style="cyan"))
         except Exception as exc:
             console.print(f"[yellow]Could not draw graph: {exc}[/]")
-        await session.__aexit__(None, None, None)
+        finally:
+            await _POOL.release(lease)
         return
 
     # --- Collect inputs ---
@@ -637,75 +1172,106 @@ Examples:
     console.print(f"[dim]Headless:[/]  {args.headless}")
     console.print()
 
-    # --- Create agent ---
-    console.print("[dim]Starting Playwright MCP server...[/]")
-    agent, mcp_client, session, session_ctx = await create_playwright_agent(
-        headless=args.headless, model_id=args.model,
-    )
+    from langchain_core.messages import HumanMessage
 
-    try:
-        display = AgentDisplay()
-
-        # --- Build the 3-message input ---
-        # Each message is clearly labeled so the agent knows what it's reading.
-        # See AGENTS.md "Input Format" for the contract.
-        msg1 = (
-            f"## TASK\n"
-            f"Test Case: {testcase}\n"
-            f"Target URL: {args.url}\n\n"
-            f"## INSTRUCTIONS\n"
-            f"Follow the test-executor skill to execute this test. "
-            f"Use the browser-tools skill for MCP tool reference. "
-            f"Produce a structured PASS/FAIL report."
-        )
-        msg2 = (
-            f"## DOCUMENTATION AGENT OUTPUT\n\n"
-            f"This is the expanded test plan from the Documentation Agent. "
-            f"Use this as your PRIMARY test plan — it has the authoritative "
-            f"steps, selectors, and expected results.\n\n"
-            f"{doc_output}"
-        )
-        msg3 = (
-            f"## EMPLOYEE AGENT OUTPUT\n\n"
-            f"This is the suggested Playwright flow from the Employee Agent, "
-            f"based on old Selenium scripts. Use this as SECONDARY reference — "
-            f"fallback selectors, test data values, and JS code fallbacks. "
-            f"Do NOT trust blindly; verify on the real page.\n\n"
-            f"{emp_output}"
+    async with open_checkpointer() as checkpointer:
+        # --- Create agent ---
+        console.print("[dim]Starting Playwright MCP server...[/]")
+        agent, lease = await create_playwright_agent(
+            headless=args.headless, model_id=args.model, checkpointer=checkpointer,
         )
 
-        messages = [
-            ("user", msg1),
-            ("user", msg2),
-            ("user", msg3),
-        ]
+        try:
+            display = AgentDisplay()
+
+            # --- Build the 3-message input ---
+            # Each message is clearly labeled so the agent knows what it's reading.
+            # See AGENTS.md "Input Format" for the contract.
+            msg1 = (
+                f"## TASK\n"
+                f"Test Case: {testcase}\n"
+                f"Target URL: {args.url}\n\n"
+                f"## INSTRUCTIONS\n"
+                f"Follow the test-executor skill to execute this test. "
+                f"Use the browser-tools skill for MCP tool reference. "
+                f"Produce a structured PASS/FAIL report."
+            )
+            msg2 = (
+                f"## DOCUMENTATION AGENT OUTPUT\n\n"
+                f"This is the expanded test plan from the Documentation Agent. "
+                f"Use this as your PRIMARY test plan — it has the authoritative "
+                f"steps, selectors, and expected results.\n\n"
+                f"{doc_output}"
+            )
+            msg3 = (
+                f"## EMPLOYEE AGENT OUTPUT\n\n"
+                f"This is the suggested Playwright flow from the Employee Agent, "
+                f"based on old Selenium scripts. Use this as SECONDARY reference — "
+                f"fallback selectors, test data values, and JS code fallbacks. "
+                f"Do NOT trust blindly; verify on the real page.\n\n"
+                f"{emp_output}"
+            )
 
-        # Unique thread ID per test case
-        thread_hash = hashlib.md5(testcase.encode()).hexdigest()[:8]
-        config = {"configurable": {"thread_id": f"pw-{thread_hash}"}}
-
-        # --- Run ---
-        await run_test_with_hitl(
-            agent=agent,
-            messages=messages,
-            config=config,
-            display=display,
-            no_save=args.no_save,
-            output_path=args.output,
-            testcase_title=testcase.strip().split("\n")[0],
-        )
+            # The three inputs are the stable prefix of every model call in this run
+            # (retries and HITL resumes only append after them). A cache breakpoint
+            # on the last one lets OpenRouter → Anthropic (and other caching
+            # providers) serve system prompt + tools + all three messages from the
+            # prompt cache. ChatOpenRouter forwards content blocks verbatim but
+            # not additional_kwargs, so the marker goes on a text block.
+            messages = [
+                HumanMessage(content=msg1),
+                HumanMessage(content=msg2),
+                HumanMessage(content=[
+                    {"type": "text", "text": msg3, "cache_control": {"type": "ephemeral"}},
+                ]),
+            ]
+
+            # Unique thread ID per test case
+            thread_hash = hashlib.blake2b(testcase.encode("utf-8"), digest_size=4).hexdigest()
+            thread_id = f"pw-{thread_hash}"
+            config = {"configurable": {"thread_id": thread_id}}
+
+            # Checkpoints persist across processes: a fresh run drops whatever an
+            # earlier run of this test case left behind, --resume picks it up if
+            # that run stopped part-way
+            if args.resume and _run_unfinished(await agent.aget_state(config)):
+                console.print(f"[dim]Resuming thread {thread_id} from its checkpoint.[/]")
+                messages = None
+            else:
+                if args.resume:
+                    console.print(
+                        "[yellow]No unfinished run to resume for this test case — "
+                        "starting a fresh run.[/]"
+                    )
+                await checkpointer.adelete_thread(thread_id)
+
+            # --- Run ---
+            await run_test_with_hitl(
+                agent=agent,
+                messages=messages,
+                config=config,
+                display=display,
+                no_save=args.no_save,
+                output_path=args.output,
+                testcase_title=testcase.strip().split("\n")[0],
+            )
 
+        finally:
+            # Hand the MCP session back to the pool (the browser stays warm)
+            await _POOL.release(lease)
+
+
+async def _run_cli() -> None:
+    """Run main(), then shut down pooled MCP sessions before the event loop closes."""
+    try:
+        await main()
     finally:
-        # Clean up MCP session
-        try:
-            await session.__aexit__(None, None, None)
-        except Exception:
-            pass
+        await _POOL.aclose()
 
 
 if __name__ == "__main__":
     try:
-        asyncio.run(main())
+        asyncio.run(_run_cli())
     except KeyboardInterrupt:
         console.print("\n[yellow]Interrupted.[/]")
         sys.exit(0)
@@ -13,16 +13,25 @@ Tools exposed to the agent:
 
 import json
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
 from langchain_core.tools import tool
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # ---------------------------------------------------------------------------
 # Paths — everything is relative to this file's directory (playwright/)
 # ---------------------------------------------------------------------------
 PLAYWRIGHT_DIR = Path(__file__).parent          # playwright/
 POSTMAN_DIR = PLAYWRIGHT_DIR / "postman"        # playwright/postman/
 
+# Parsed collections, keyed by path and validated by (st_mtime_ns, st_size):
+# path -> (stat key, parsed JSON, {include_bodies: _extract_requests() of its items})
+_COLLECTION_CACHE: dict[Path, tuple[tuple[int, int], dict, dict[bool, list[dict]]]] = {}
+
 
 # ---------------------------------------------------------------------------
 # Internal helpers
@@ -51,45 +60,130 @@ def _find_collection_file(collection_name: str) -> Path | None:
     return None
 
 
-def _extract_requests(items: list[dict], folder_path: str = "") -> list[dict]:
-    """Recursively extract requests from a Postman collection item tree."""
-    requests = []
-    for item in items:
-        current_path = f"{folder_path}/{item.get('name', '?')}" if folder_path else item.get("name", "?")
+def _loads(data: bytes) -> Any:
+    """json.loads, through orjson when it is installed.
+
+    Input orjson rejects (BOM, NaN, ...) is handed to the stdlib parser, so
+    error messages stay those of json.loads. One difference: orjson reads
+    integers wider than 64 bits as floats — harmless here, as only strings
+    (names, URLs, headers, bodies) are read from collections.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
+
+
+def _cached_collection(filepath: Path) -> tuple[tuple[int, int], dict, dict[bool, list[dict]]]:
+    """The _COLLECTION_CACHE entry for *filepath*, re-parsed only when the file changes."""
+    st = filepath.stat()
+    key = (st.st_mtime_ns, st.st_size)
+    cached = _COLLECTION_CACHE.get(filepath)
+    if cached is None or cached[0] != key:
+        cached = (key, _loads(filepath.read_bytes()), {})
+        _COLLECTION_CACHE[filepath] = cached
+    return cached
+
+
+def _parse_collection(filepath: Path) -> dict:
+    """Parsed collection JSON only — no request overview is built.
+
+    Raises OSError / ValueError like read + json.loads. Callers must not
+    mutate the returned dict — it is shared across calls.
+    """
+    return _cached_collection(filepath)[1]
+
+
+def _load_collection(filepath: Path, include_bodies: bool = True) -> tuple[dict, list[dict]]:
+    """Parsed collection JSON and its request overview, re-parsed only when the file changes.
+
+    The overview is built on first use; pass include_bodies=False when only
+    the requests themselves matter (e.g. counting) to skip body previews.
+    Raises OSError / ValueError like read + json.loads. Callers must not
+    mutate the returned objects — they are shared across calls.
+    """
+    _, data, overviews = _cached_collection(filepath)
+    if include_bodies in overviews:
+        return data, overviews[include_bodies]
+    if True in overviews:
+        # An overview with bodies also serves callers that don't need them
+        return data, overviews[True]
+    requests = _extract_requests(data.get("item", []), include_bodies=include_bodies)
+    overviews[include_bodies] = requests
+    return data, requests
+
+
+def _iter_requests(items: list[dict]) -> Iterator[tuple[str, str, dict]]:
+    """Yield (name, folder, item) for every request in a Postman item tree, in document order.
+
+    Walks the tree with an explicit stack (no recursion) and formats nothing,
+    so a lookup that stops early only pays for the items it visited.
+    """
+    stack = [(item, "") for item in reversed(items)]
+    while stack:
+        item, folder_path = stack.pop()
 
         if "request" in item:
-            req = item["request"]
-            entry = {
-                "name": item.get("name", "Unnamed"),
-                "folder": folder_path or "(root)",
-                "method": req.get("method", "GET"),
-                "url": _extract_url(req.get("url", "")),
-            }
-
-            # Extract headers
-            headers = req.get("header", [])
-            if headers:
-                entry["headers"] = [
-                    f"{h.get('key', '?')}: {h.get('value', '?')}"
-                    for h in headers if isinstance(h, dict)
-                ]
-
-            # Extract body (truncated for overview)
-            body = req.get("body", {})
-            if body:
-                raw = body.get("raw", "")
-                if raw:
-                    entry["body_type"] = body.get("mode", "raw")
-                    entry["body_preview"] = raw[:200] + ("..." if len(raw) > 200 else "")
-                    entry["body_length"] = len(raw)
-
-            requests.append(entry)
-
-        # Recurse into sub-items (folders)
+            yield item.get("name", "Unnamed"), folder_path or "(root)", item
+
+        # Queue sub-items (folders) so they are visited before the next sibling
         if "item" in item:
-            requests.extend(_extract_requests(item["item"], current_path))
+            name = item.get("name", "?")
+            current_path = f"{folder_path}/{name}" if folder_path else name
+            stack.extend((sub, current_path) for sub in reversed(item["item"]))
+
+
+def _request_entry(
+    name: str,
+    folder: str,
+    req: dict,
+    full: bool = False,
+    include_bodies: bool = True,
+) -> dict:
+    """Summarise one Postman request.
+
+    Bodies are previewed unless *full*, which keeps the raw body; with
+    include_bodies=False they are not looked at at all.
+    """
+    entry = {
+        "name": name,
+        "folder": folder,
+        "method": req.get("method", "GET"),
+        "url": _extract_url(req.get("url", "")),
+    }
+
+    # Extract headers
+    headers = req.get("header", [])
+    if headers:
+        entry["headers"] = [
+            f"{h.get('key', '?')}: {h.get('value', '?')}"
+            for h in headers if isinstance(h, dict)
+        ]
 
-    return requests
+    # Extract body (truncated for overview unless full)
+    body = req.get("body", {}) if include_bodies else None
+    if body:
+        raw = body.get("raw", "")
+        if raw:
+            entry["body_type"] = body.get("mode", "raw")
+            if full:
+                entry["body"] = raw
+            else:
+                n = len(raw)
+                entry["body_preview"] = raw if n <= 200 else raw[:200] + "..."
+                entry["body_length"] = n
+
+    return entry
+
+
+def _extract_requests(items: list[dict], full: bool = False, include_bodies: bool = True) -> list[dict]:
+    """Flatten a Postman collection item tree into request entries (see _request_entry)."""
+    return [
+        _request_entry(name, folder, item["request"], full, include_bodies)
+        for name, folder, item in _iter_requests(items)
+    ]
 
 
 def _extract_url(url_obj: Any) -> str:
@@ -128,19 +222,18 @@ def list_postman_collections() -> str:
     entries: list[str] = []
     for f in json_files:
         try:
-            data = json.loads(f.read_text(encoding="utf-8"))
+            data, requests = _load_collection(f, include_bodies=False)
             info = data.get("info", {})
             name = info.get("name", f.stem)
             desc = info.get("description", "(no description)")[:100]
-            items = data.get("item", [])
-            req_count = len(_extract_requests(items))
+            req_count = len(requests)
             entries.append(
                 f"  **{f.name}**\n"
                 f"    Name: {name}\n"
                 f"    Description: {desc}\n"
                 f"    Requests: {req_count}"
             )
-        except (json.JSONDecodeError, OSError) as exc:
+        except (ValueError, OSError) as exc:
             entries.append(f"  **{f.name}** — Error reading: {exc}")
 
     return f"Postman collections ({len(json_files)} files):\n\n" + "\n\n".join(entries)
@@ -165,14 +258,12 @@ def read_postman_collection(collection_name: str) -> str:
         )
 
     try:
-        data = json.loads(filepath.read_text(encoding="utf-8"))
-    except (json.JSONDecodeError, OSError) as exc:
+        data, requests = _load_collection(filepath)
+    except (ValueError, OSError) as exc:
         return f"Error reading '{collection_name}': {exc}"
 
     info = data.get("info", {})
     collection_title = info.get("name", filepath.stem)
-    items = data.get("item", [])
-    requests = _extract_requests(items)
 
     if not requests:
         return f"Collection '{collection_title}' has no requests."
@@ -213,29 +304,33 @@ def get_postman_request(collection_name: str, request_name: str) -> str:
         )
 
     try:
-        data = json.loads(filepath.read_text(encoding="utf-8"))
-    except (json.JSONDecodeError, OSError) as exc:
+        data = _parse_collection(filepath)
+    except (ValueError, OSError) as exc:
         return f"Error reading '{collection_name}': {exc}"
 
     items = data.get("item", [])
-    all_requests = _extract_requests_full(items)
 
-    # Find by name (case-insensitive partial match)
+    # Find by name (case-insensitive partial match). The shortest matching name
+    # wins, so an exact match ends the walk; only the winner gets formatted.
     search = request_name.lower()
-    matches = [r for r in all_requests if search in r["name"].lower()]
-
-    if not matches:
-        names = [r["name"] for r in all_requests]
+    best = None
+    for name, folder, item in _iter_requests(items):
+        lowered = name.lower()
+        if lowered == search:
+            best = (name, folder, item)
+            break
+        if search in lowered and (best is None or len(name) < len(best[0])):
+            best = (name, folder, item)
+
+    if best is None:
+        names = [name for name, _, _ in _iter_requests(items)]
         return (
             f"Request '{request_name}' not found in collection. "
             f"Available requests: {', '.join(names)}"
         )
 
-    if len(matches) > 1:
-        # Return the best match (shortest name containing the search term)
-        matches.sort(key=lambda r: len(r["name"]))
-
-    req = matches[0]
+    name, folder, item = best
+    req = _request_entry(name, folder, item["request"], full=True)
     lines = [
         f"**Request: {req['name']}**",
         f"Method: {req['method']}",
@@ -254,43 +349,6 @@ def get_postman_request(collection_name: str, request_name: str) -> str:
     return "\n".join(lines)
 
 
-def _extract_requests_full(items: list[dict], folder_path: str = "") -> list[dict]:
-    """Like _extract_requests but includes the FULL body (not truncated)."""
-    requests = []
-    for item in items:
-        current_path = f"{folder_path}/{item.get('name', '?')}" if folder_path else item.get("name", "?")
-
-        if "request" in item:
-            req = item["request"]
-            entry = {
-                "name": item.get("name", "Unnamed"),
-                "folder": folder_path or "(root)",
-                "method": req.get("method", "GET"),
-                "url": _extract_url(req.get("url", "")),
-            }
-
-            headers = req.get("header", [])
-            if headers:
-                entry["headers"] = [
-                    f"{h.get('key', '?')}: {h.get('value', '?')}"
-                    for h in headers if isinstance(h, dict)
-                ]
-
-            body = req.get("body", {})
-            if body:
-                raw = body.get("raw", "")
-                if raw:
-                    entry["body_type"] = body.get("mode", "raw")
-                    entry["body"] = raw
-
-            requests.append(entry)
-
-        if "item" in item:
-            requests.extend(_extract_requests_full(item["item"], current_path))
-
-    return requests
-
-
 @tool
 def build_curl_command(
     method: str,
@@ -0,0 +1,120 @@
+"""Tests for employee.tools._grep_scripts_impl."""
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from employee.tools import _MMAP_MIN_SIZE, _grep_scripts_impl  # noqa: E402
+
+
+class GrepScriptsLimitTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _write(self, name: str, n_hits: int) -> Path:
+        path = self.root / name
+        path.write_text("".join(f"driver.find_element(By.XPATH, '//x{i}')\n" for i in range(n_hits)))
+        return path
+
+    def test_single_file_is_not_capped_per_file(self):
+        path = self._write("test_many.py", 17)
+        out = _grep_scripts_impl("xpath", path, context_lines=0, max_matches=40)
+        self.assertTrue(out.startswith("[17 match(es) for 'xpath']"), out)
+        self.assertNotIn("Per-file limit", out)
+
+    def test_directory_scan_caps_each_file(self):
+        self._write("test_a.py", 17)
+        self._write("test_b.py", 3)
+        out = _grep_scripts_impl("xpath", self.root, context_lines=0, max_matches=40)
+        self.assertTrue(out.startswith("[13 match(es) for 'xpath']"), out)
+        self.assertIn("Per-file limit: first 10 matches shown for scripts/test_a.py", out)
+
+
+class GrepScriptsCrlfTest(unittest.TestCase):
+    def test_dollar_matches_at_end_of_crlf_line(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "test_crlf.py"
+            path.write_bytes(b"await page.click('x')\r\nfoo\r\n")
+            out = _grep_scripts_impl(r"\)$", path, context_lines=0)
+            self.assertTrue(out.startswith("[1 match(es)"), out)
+            out = _grep_scripts_impl(r"^foo$", path, context_lines=0)
+            self.assertTrue(out.startswith("[1 match(es)"), out)
+            self.assertIn(">>> L   2: foo", out)
+
+
+class GrepScriptsMmapTest(unittest.TestCase):
+    """Files of at least _MMAP_MIN_SIZE bytes are scanned through mmap."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _write(self, name: str, comment: str = "filler") -> Path:
+        # Every 100th line (L100, L200, ...) ends with ')'; CRLF line endings throughout
+        lines = [
+            "page.click('go')" if i % 100 == 0 else f"x_{i} = {i}  # {comment} padding padding"
+            for i in range(1, 3001)
+        ]
+        path = self.root / name
+        path.write_bytes("\r\n".join(lines).encode("utf-8") + b"\r\n")
+        self.assertGreaterEqual(path.stat().st_size, _MMAP_MIN_SIZE)
+        return path
+
+    def test_single_large_crlf_file_reports_every_match(self):
+        path = self._write("test_big.py")
+        out = _grep_scripts_impl(r"\)$", path, context_lines=0, max_matches=40)
+        self.assertTrue(out.startswith("[30 match(es)"), out[:80])
+        self.assertIn(">>> L 100: page.click('go')", out)
+        self.assertIn(">>> L3000: page.click('go')", out)
+        self.assertNotIn("\r", out)
+
+    def test_directory_scan_caps_large_file_beyond_limit(self):
+        self._write("test_big.py")
+        out = _grep_scripts_impl(r"\)$", self.root, context_lines=0, max_matches=40)
+        self.assertTrue(out.startswith("[10 match(es)"), out[:80])
+        self.assertIn(">>> L1000: page.click('go')", out)
+        self.assertNotIn("L1100", out)
+        self.assertIn("Per-file limit: first 10 matches shown for scripts/test_big.py", out)
+
+    def test_large_non_ascii_file_is_searched_as_text(self):
+        path = self._write("test_big.py", comment="café")
+        out = _grep_scripts_impl(r"caf. padding padding$", path, context_lines=0, max_matches=5)
+        self.assertTrue(out.startswith("[5 match(es)"), out[:80])
+        self.assertIn(">>> L   1: x_1 = 1  # café padding padding", out)
+
+
+class GrepScriptsUnicodeTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self._tmp.name) / "test_unicode.py"
+        self.path.write_text("x = 'Ärger'\ny = 'aéb'\r\n", encoding="utf-8")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _count(self, pattern: str) -> str:
+        return _grep_scripts_impl(pattern, self.path, context_lines=0).split("\n", 1)[0]
+
+    def test_non_ascii_pattern_is_case_insensitive(self):
+        self.assertEqual(self._count("ärger"), "[1 match(es) for 'ärger']")
+
+    def test_dot_matches_one_non_ascii_character(self):
+        self.assertEqual(self._count("a.b"), "[1 match(es) for 'a.b']")
+        self.assertEqual(self._count("a.b'$"), "[1 match(es) for 'a.b'$']")
+
+    def test_unicode_escapes(self):
+        self.assertEqual(self._count(r"\u00e9"), "[1 match(es) for '\\u00e9']")
+        self.assertEqual(self._count(r"\N{LATIN SMALL LETTER E WITH ACUTE}")[:12], "[1 match(es)")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,155 @@
+"""Tests for employee.tools script ranking (BM25) and the index cache."""
+
+import json
+import math
+import re
+import sys
+import tempfile
+import unittest
+from collections import Counter
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from employee import tools  # noqa: E402
+from utils.fuzzy_search import expand_synonyms  # noqa: E402
+
+INDEX = [
+    {
+        "filename": "test_login.py",
+        "class_names": ["LoginPage"],
+        "method_names": ["test_login_with_valid_password", "test_login_lockout"],
+        "docstring": "Login flow: password field, sign in button, lockout after failures.",
+    },
+    {
+        "filename": "test_records.py",
+        "class_names": ["RecordsPage"],
+        "method_names": ["test_create_record", "test_delete_record"],
+        "docstring": "Create and delete records from the records table.",
+    },
+    {
+        "filename": "test_export.py",
+        "class_names": [],
+        "method_names": ["test_download_csv"],
+        "docstring": "Export the records grid as CSV.",
+    },
+    {
+        "filename": "test_profile.py",
+        "class_names": ["ProfilePage"],
+        "method_names": ["test_change_password"],
+        "docstring": "",
+    },
+    {"filename": "test_empty.py"},
+]
+
+
+def _baseline_tokenize(text: str) -> list[str]:
+    """The original tokenizer: split on non-alphanumerics, drop 1-char tokens."""
+    return [t for t in re.split(r"[^a-z0-9]+", text.lower()) if len(t) > 1]
+
+
+def _reference_bm25(query: str, index: list[dict], top_k: int) -> list[tuple[str, float]]:
+    """Textbook Okapi BM25 with Lucene's IDF, computed per query from scratch."""
+    docs = [
+        _baseline_tokenize(" ".join([
+            e.get("filename", ""),
+            " ".join(e.get("class_names", [])),
+            " ".join(e.get("method_names", [])),
+            e.get("docstring", ""),
+        ]))
+        for e in index
+    ]
+    n_docs = len(docs)
+    avgdl = sum(map(len, docs)) / n_docs
+    df = Counter(t for d in docs for t in set(d))
+    q_tf = Counter(_baseline_tokenize(" ".join(expand_synonyms(query, max_variants=8))))
+    k1, b, k3 = tools._BM25_K1, tools._BM25_B, tools._BM25_K3
+
+    results = []
+    for entry, doc in zip(index, docs):
+        d_tf = Counter(doc)
+        score = 0.0
+        for t, qtf in q_tf.items():
+            tf = d_tf.get(t, 0)
+            if not tf:
+                continue
+            idf = math.log(1 + (n_docs - df[t] + 0.5) / (df[t] + 0.5))
+            norm = k1 * (1 - b + b * len(doc) / avgdl)
+            score += idf * tf * (k1 + 1) / (tf + norm) * (k3 + 1) * qtf / (k3 + qtf)
+        if score > 0.01:
+            results.append((entry["filename"], score))
+    results.sort(key=lambda x: x[1], reverse=True)
+    return results[:top_k]
+
+
+class TokenizeTest(unittest.TestCase):
+    def test_matches_baseline_tokenizer(self):
+        for text in ["test_login_with_valid_password", "Sign-In (v2) a b cd", "", "ÄrgerXPath__x9"]:
+            self.assertEqual(tools._tokenize(text), _baseline_tokenize(text), text)
+
+
+class Bm25RankingTest(unittest.TestCase):
+    def _check(self, query: str, top_k: int = 5):
+        got = [(name, score) for name, score, _ in tools._tfidf_similarity(query, INDEX, top_k)]
+        want = _reference_bm25(query, INDEX, top_k)
+        self.assertEqual([n for n, _ in got], [n for n, _ in want], query)
+        for (_, g), (_, w) in zip(got, want):
+            self.assertAlmostEqual(g, w, places=9)
+        return got
+
+    def test_scores_match_reference(self):
+        for query in ["login password", "delete record", "export csv", "pass", "records", "lockout"]:
+            self._check(query)
+
+    def test_short_document_outranks_long_one_with_same_term(self):
+        got = self._check("password")
+        self.assertEqual([n for n, _ in got], ["test_profile.py", "test_login.py"])
+
+    def test_top_k_and_no_match(self):
+        self.assertEqual(len(self._check("records test", top_k=2)), 2)
+        self.assertEqual(tools._tfidf_similarity("zzz qqq", INDEX), [])
+        self.assertEqual(tools._tfidf_similarity("login", []), [])
+
+    def test_result_carries_index_entry(self):
+        name, _, entry = tools._tfidf_similarity("export", INDEX)[0]
+        self.assertEqual(name, "test_export.py")
+        self.assertIs(entry, INDEX[2])
+
+
+class IndexCacheTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        root = Path(self._tmp.name)
+        (root / "scripts_index.json").write_text(json.dumps(INDEX))
+        self._patches = [
+            mock.patch.object(tools, "INDEX_PATH", root / "scripts_index.json"),
+            mock.patch.object(tools, "CACHE_PATH", root / "scripts_index.cache.pkl"),
+            mock.patch.dict(tools._INDEX_CACHE, {"mtime_ns": None, "index": [], "derived": {}}),
+        ]
+        for p in self._patches:
+            p.start()
+
+    def tearDown(self):
+        for p in reversed(self._patches):
+            p.stop()
+        self._tmp.cleanup()
+
+    def test_cold_load_writes_cache_once_with_every_derived_key(self):
+        with mock.patch.object(tools, "_write_index_cache", wraps=tools._write_index_cache) as write:
+            index = tools._load_index()
+            tools._tfidf_similarity("login", index)
+            tools._get_columns(index)
+        self.assertEqual(write.call_count, 1)
+        self.assertEqual(set(tools._INDEX_CACHE["derived"]), set(tools._DERIVED_BUILDERS))
+
+    def test_warm_load_ranks_like_cold_load(self):
+        cold = tools._tfidf_similarity("delete record", tools._load_index())
+        tools._INDEX_CACHE.update(mtime_ns=None, index=[], derived={})
+        warm_index = tools._load_index()
+        self.assertEqual(set(tools._INDEX_CACHE["derived"]), set(tools._DERIVED_BUILDERS))
+        warm = tools._tfidf_similarity("delete record", warm_index)
+        self.assertEqual([(n, s) for n, s, _ in warm], [(n, s) for n, s, _ in cold])
+
+
+if __name__ == "__main__":
+    unittest.main()
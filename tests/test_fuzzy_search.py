@@ -0,0 +1,121 @@
+"""Tests for utils.fuzzy_search synonym expansion and heading matching."""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from utils.fuzzy_search import (  # noqa: E402
+    HeadingEntry,
+    _build_synonym_lookup,
+    _fuzzy_match_headings,
+    _get_synonyms,
+    _similarity,
+    expand_synonyms,
+)
+
+LOGIN = ("auth", "log in", "login", "sign in", "signin")
+
+
+class ExpandSynonymsTest(unittest.TestCase):
+    def test_prefix_of_a_key_expands_to_its_group(self):
+        self.assertEqual(expand_synonyms("pass"), ["pass", "passphrase", "password", "pwd"])
+
+    def test_two_word_key_is_matched_as_one_unit(self):
+        self.assertEqual(expand_synonyms("sign in"), ["sign in", "auth", "log in", "login", "signin"])
+        self.assertEqual(expand_synonyms("sign in button")[:4], [
+            "sign in button", "auth btn", "auth button", "auth cta",
+        ])
+
+    def test_partial_matches_take_the_earliest_group(self):
+        self.assertEqual(_get_synonyms("buttons"), ("btn", "button", "cta"))
+        self.assertEqual(_get_synonyms("log"), LOGIN)  # before logout's "log out"
+        self.assertEqual(_get_synonyms("in"), ("field", "input", "text input", "textbox"))
+        self.assertEqual(_get_synonyms("xyzzy"), ("xyzzy",))
+
+    def test_original_term_first_and_capped(self):
+        variants = expand_synonyms("Confirm Dialog", max_variants=5)
+        self.assertEqual(variants[0], "confirm dialog")
+        self.assertEqual(len(variants), 5)
+        self.assertEqual(len(set(variants)), 5)
+        self.assertEqual(expand_synonyms("xyzzy"), ["xyzzy"])
+
+    def test_returns_fresh_list(self):
+        expand_synonyms("dialog").append("mutated")
+        self.assertNotIn("mutated", expand_synonyms("dialog"))
+
+
+class SynonymLookupTest(unittest.TestCase):
+    def test_overlapping_groups_merge_in_any_order(self):
+        groups = [frozenset({"a", "b"}), frozenset({"c", "d"}), frozenset({"b", "c"}), frozenset({"x", "y"})]
+        for order in (groups, groups[::-1], [groups[2], groups[0], groups[3], groups[1]]):
+            lookup = _build_synonym_lookup(order)
+            self.assertEqual(lookup["a"], ("a", "b", "c", "d"))
+            self.assertIs(lookup["a"], lookup["d"])
+            self.assertEqual(lookup["y"], ("x", "y"))
+
+
+def _baseline_match(term, index, threshold=0.40, max_results=8):
+    """The original exhaustive matcher: every heading against every variant."""
+    variants = expand_synonyms(term, max_variants=12)
+    scored = []
+    for entry in index:
+        best = 0.0
+        heading_lower = entry.text.lower()
+        heading_tokens = set(heading_lower.replace("(", " ").replace(")", " ").split())
+        for variant in variants:
+            best = max(best, _similarity(variant, heading_lower))
+            if variant in heading_lower or heading_lower in variant:
+                best = max(best, 0.75)
+            variant_tokens = set(variant.split())
+            if variant_tokens and heading_tokens:
+                best = max(best, len(variant_tokens & heading_tokens) / len(variant_tokens) * 0.85)
+        if best >= threshold:
+            scored.append((entry, best))
+    scored.sort(key=lambda x: x[1], reverse=True)
+    return scored[:max_results]
+
+
+HEADINGS = [
+    "Login Page", "Sign In Button", "Password Field", "Records Table", "Delete Record (Modal)",
+    "Confirm Dialog", "Login Page", "Submit Button", "Toast Notification", "Search Input",
+    "Export CSV", "Sidebar Navigation", "Login", "Logout Button", "User Menu", "Delete Dialog",
+    "Save Button", "Confirm Delete", "Records", "Error Toast", "Pagination Controls",
+]
+
+
+class FuzzyMatchHeadingsTest(unittest.TestCase):
+    def setUp(self):
+        self.index = [
+            HeadingEntry(text, Path(f"/docs/page{i % 3}.md"), i + 1, 3)
+            for i, text in enumerate(HEADINGS)
+        ]
+
+    def _check(self, term, **kwargs):
+        got = _fuzzy_match_headings(term, self.index, **kwargs)
+        want = _baseline_match(term, self.index, **kwargs)
+        self.assertEqual(
+            [(e.line_number, round(s, 9)) for e, s in got],
+            [(e.line_number, round(s, 9)) for e, s in want],
+            term,
+        )
+        return got
+
+    def test_matches_exhaustive_search(self):
+        for term in ["login", "delete dialog", "button", "pass", "sign in", "records tabel", "xyzzy", "toast"]:
+            self._check(term)
+
+    def test_pruning_keeps_best_when_capped(self):
+        for max_results in (1, 2, 3, 5):
+            self._check("confirm button", max_results=max_results)
+            self._check("delete", max_results=max_results, threshold=0.2)
+
+    def test_ties_keep_index_order(self):
+        got = self._check("login page")
+        tied = [e.line_number for e, s in got if e.text == "Login Page"]
+        self.assertEqual(tied, [1, 7])
+        self.assertEqual(got[0][1], got[1][1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+"""Tests for the Postman collection cache in playwright/tools.py."""
+
+import importlib.util
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+TOOLS_PATH = Path(__file__).resolve().parent.parent / "playwright" / "tools.py"
+
+try:
+    _spec = importlib.util.spec_from_file_location("playwright_tools", TOOLS_PATH)
+    pw_tools = importlib.util.module_from_spec(_spec)
+    _spec.loader.exec_module(pw_tools)
+except ImportError:  # langchain_core not installed
+    pw_tools = None
+
+COLLECTION = {
+    "info": {"name": "Records API"},
+    "item": [
+        {
+            "name": "Records",
+            "item": [
+                {
+                    "name": "Create Record",
+                    "request": {
+                        "method": "POST",
+                        "url": {"raw": "{{base}}/records"},
+                        "header": [{"key": "Content-Type", "value": "application/json"}],
+                        "body": {"mode": "raw", "raw": "x" * 250},
+                    },
+                },
+            ],
+        },
+        {"name": "Health", "request": {"url": "{{base}}/health"}},
+    ],
+}
+
+
+@unittest.skipIf(pw_tools is None, "langchain_core is not installed")
+class CollectionCacheTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self._tmp.name) / "records.json"
+        self.path.write_text(json.dumps(COLLECTION))
+        pw_tools._COLLECTION_CACHE.clear()
+
+    def tearDown(self):
+        pw_tools._COLLECTION_CACHE.clear()
+        self._tmp.cleanup()
+
+    def test_overview_is_cached_per_include_bodies(self):
+        data, lean = pw_tools._load_collection(self.path, include_bodies=False)
+        self.assertEqual([r["name"] for r in lean], ["Create Record", "Health"])
+        self.assertNotIn("body_preview", lean[0])
+        self.assertIs(pw_tools._load_collection(self.path, include_bodies=False)[1], lean)
+
+        data2, full = pw_tools._load_collection(self.path)
+        self.assertIs(data2, data)
+        self.assertEqual(full[0]["body_length"], 250)
+        self.assertEqual(full[0]["body_preview"], "x" * 200 + "...")
+        self.assertEqual(full[0]["folder"], "Records")
+        self.assertEqual(full[1]["folder"], "(root)")
+
+    def test_overview_with_bodies_serves_lean_callers(self):
+        _, full = pw_tools._load_collection(self.path)
+        self.assertIs(pw_tools._load_collection(self.path, include_bodies=False)[1], full)
+
+    def test_parse_only_builds_no_overview(self):
+        data = pw_tools._parse_collection(self.path)
+        self.assertEqual(data["info"]["name"], "Records API")
+        self.assertEqual(pw_tools._COLLECTION_CACHE[self.path][2], {})
+        self.assertIs(pw_tools._load_collection(self.path)[0], data)
+
+    def test_changed_file_is_reparsed(self):
+        _, before = pw_tools._load_collection(self.path)
+        changed = dict(COLLECTION, item=COLLECTION["item"][1:])
+        self.path.write_text(json.dumps(changed))
+        st = self.path.stat()
+        os.utime(self.path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        _, after = pw_tools._load_collection(self.path)
+        self.assertIsNot(after, before)
+        self.assertEqual([r["name"] for r in after], ["Health"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,11 @@
 """
 Fuzzy / meaning-aware search utilities for the Documentation Agent.
 
-Uses only Python stdlib (difflib + re) — zero external dependencies.
+Uses only Python stdlib (difflib + re) — zero external dependencies. When the
+optional rapidfuzz package is installed, its C similarity ratio is used instead
+of difflib's; the two can disagree (see _similarity), so scores, the threshold
+cut and result order may differ slightly between installs. With pyahocorasick,
+large synonym sets are matched with one Aho-Corasick automaton instead of a regex.
 
 Three layers of matching (all merged into one result):
   1. Synonym expansion  — maps "dialog" → also try "modal", "popup", etc.
@@ -16,12 +20,27 @@ Public API:
 
 from __future__ import annotations
 
+import os
 import re
-from dataclasses import dataclass
+from bisect import bisect_right
+from dataclasses import dataclass, field
 from difflib import SequenceMatcher
-from itertools import product
+from functools import lru_cache
+from io import StringIO
+from heapq import heappush, heappushpop
+from itertools import groupby, islice, product
 from pathlib import Path
-from typing import Sequence
+from typing import Callable, Iterator, Sequence
+
+try:
+    from rapidfuzz.fuzz import ratio as _rapidfuzz_ratio
+except ImportError:
+    _rapidfuzz_ratio = None
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
 
 
 # ---------------------------------------------------------------------------
@@ -69,23 +88,75 @@ _SYNONYM_GROUPS: list[frozenset[str]] = [
     frozenset({"action", "actions menu", "kebab", "overflow menu", "three dots"}),
 ]
 
-# Build a fast lookup: token → set of synonyms (including itself)
-_SYNONYM_LOOKUP: dict[str, set[str]] = {}
-for _group in _SYNONYM_GROUPS:
+def _build_synonym_lookup(groups: Sequence[frozenset[str]]) -> dict[str, tuple[str, ...]]:
+    """Map each word to the sorted tuple of its synonym class (including itself).
+
+    Groups that share a word are merged with union-find, so overlapping groups
+    form one class whatever order they are listed in. Every word of a class
+    shares the same immutable tuple object.
+    """
+    parent: dict[str, str] = {}
+
+    def find(word: str) -> str:
+        root = parent.setdefault(word, word)
+        while root != parent[root]:
+            root = parent[root]
+        while word != root:  # path compression
+            parent[word], word = root, parent[word]
+        return root
+
+    for group in groups:
+        first, *rest = group
+        for word in rest:
+            parent[find(word)] = find(first)
+
+    classes: dict[str, list[str]] = {}
+    for word in parent:
+        classes.setdefault(find(word), []).append(word)
+
+    lookup: dict[str, tuple[str, ...]] = {}
+    for members in classes.values():
+        syns = tuple(sorted(members))
+        lookup.update(dict.fromkeys(syns, syns))
+    return lookup
+
+
+# Fast lookup: token → sorted tuple of synonyms (including itself)
+_SYNONYM_LOOKUP = _build_synonym_lookup(_SYNONYM_GROUPS)
+
+# Rank of each key: the position of the first group that lists it
+_KEY_RANK: dict[str, int] = {}
+for _rank, _group in enumerate(_SYNONYM_GROUPS):
     for _word in _group:
-        _SYNONYM_LOOKUP.setdefault(_word, set()).update(_group)
+        _KEY_RANK.setdefault(_word, _rank)
 
+# Every proper prefix of a key ("pass" → "password") → its lowest-ranked key,
+# so _get_synonyms never has to scan the whole lookup for a partial match
+_PREFIX_KEY: dict[str, str] = {}
+for _word, _rank in _KEY_RANK.items():
+    for _end in range(1, len(_word)):
+        _prefix = _word[:_end]
+        if _prefix not in _PREFIX_KEY or _KEY_RANK[_PREFIX_KEY[_prefix]] > _rank:
+            _PREFIX_KEY[_prefix] = _word
 
-def _get_synonyms(token: str) -> set[str]:
-    """Return the synonym set for a token, or {token} if no synonyms are known."""
+
+def _get_synonyms(token: str) -> tuple[str, ...]:
+    """Return the sorted synonyms for a token, or (token,) if no synonyms are known.
+
+    Unknown tokens fall back to a partial match — a key the token starts with
+    ("buttons" → "button") or one that starts with the token ("pass" →
+    "password"); the key from the earliest group wins.
+    """
     token_lower = token.lower().strip()
-    if token_lower in _SYNONYM_LOOKUP:
-        return _SYNONYM_LOOKUP[token_lower]
-    # Try partial match — e.g. "buttons" matches "button"
-    for key, syns in _SYNONYM_LOOKUP.items():
-        if token_lower.startswith(key) or key.startswith(token_lower):
-            return syns
-    return {token_lower}
+    syns = _SYNONYM_LOOKUP.get(token_lower)
+    if syns is not None:
+        return syns
+    keys = [token_lower[:end] for end in range(1, len(token_lower)) if token_lower[:end] in _KEY_RANK]
+    if token_lower in _PREFIX_KEY:
+        keys.append(_PREFIX_KEY[token_lower])
+    if not keys:
+        return (token_lower,)
+    return _SYNONYM_LOOKUP[min(keys, key=_KEY_RANK.__getitem__)]
 
 
 def expand_synonyms(term: str, max_variants: int = 15) -> list[str]:
@@ -95,38 +166,57 @@ def expand_synonyms(term: str, max_variants: int = 15) -> list[str]:
     "submit dialog", "submit modal", "submit popup", "save dialog", ...]
 
     Returns at most *max_variants* patterns (to avoid combinatorial explosion).
-    The original term is always first.
+    The original term is always first.  Results are memoized per
+    (term, max_variants); each call returns a fresh list.
     """
+    return list(_expand_synonyms_cached(term, max_variants))
+
+
+@lru_cache(maxsize=1024)
+def _expand_synonyms_cached(term: str, max_variants: int) -> tuple[str, ...]:
+    """Memoized body of expand_synonyms — returns an immutable tuple."""
     tokens = term.lower().split()
     if not tokens:
-        return [term]
-
-    # For each token, get its synonym alternatives
-    token_options: list[list[str]] = []
-    for tok in tokens:
-        syns = sorted(_get_synonyms(tok))
-        token_options.append(syns)
+        return (term,)
+
+    # For each token, get its synonym alternatives (already sorted). Two-word
+    # keys ("sign in", "file upload") are matched as one unit.
+    token_options: list[tuple[str, ...]] = []
+    i = 0
+    while i < len(tokens):
+        pair = " ".join(tokens[i:i + 2])
+        if i + 1 < len(tokens) and pair in _SYNONYM_LOOKUP:
+            token_options.append(_SYNONYM_LOOKUP[pair])
+            i += 2
+        else:
+            token_options.append(_get_synonyms(tokens[i]))
+            i += 1
+
+    # No token has a synonym: the only variant is the term itself, so skip the
+    # product (and callers skip their synonym pass)
+    term_lower = term.lower()
+    if all(len(opts) == 1 for opts in token_options):
+        joined = " ".join(tokens)
+        return (term_lower,) if joined == term_lower else (term_lower, joined)[:max_variants]
 
-    # Cartesian product, capped
-    variants: list[str] = []
+    # Cartesian product, capped and deduplicated, original term first
+    variants = {term_lower: None}
     for combo in product(*token_options):
-        variants.append(" ".join(combo))
         if len(variants) >= max_variants:
             break
+        variants[" ".join(combo)] = None
 
-    # Ensure original term is first
-    term_lower = term.lower()
-    if term_lower in variants:
-        variants.remove(term_lower)
-    variants.insert(0, term_lower)
-
-    return variants[:max_variants]
+    return tuple(variants)[:max_variants]
 
 
 # ---------------------------------------------------------------------------
 # 2. Heading index — extracts ### headings from .md files
 # ---------------------------------------------------------------------------
 
+# Parentheses count as token separators when matching headings
+_PAREN_TRANS = str.maketrans("()", "  ")
+
+
 @dataclass(frozen=True, slots=True)
 class HeadingEntry:
     """A single ### heading extracted from a markdown file."""
@@ -134,33 +224,85 @@ class HeadingEntry:
     filepath: Path      # absolute path to the .md file
     line_number: int    # 1-based line number
     level: int          # heading level (1 for #, 2 for ##, 3 for ###)
+    # Derived once here instead of per (variant × heading) in the matcher
+    text_lower: str = field(init=False, repr=False, compare=False)
+    tokens: frozenset[str] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        text_lower = self.text.lower()
+        object.__setattr__(self, "text_lower", text_lower)
+        object.__setattr__(self, "tokens", frozenset(text_lower.translate(_PAREN_TRANS).split()))
+
+
+# Heading-index caches. Per search root: the (path, mtime_ns, size) listing the
+# index was built from, its entries and their token postings. Per file: its stat
+# key, headings and heading marks (see _parse_headings), so a changed tree only
+# re-parses the files that changed.
+_HEADING_INDEX_CACHE: dict[
+    Path,
+    tuple[tuple[tuple[Path, int, int], ...], list[HeadingEntry], dict[str, list[int]]],
+] = {}
+_FILE_HEADINGS_CACHE: dict[
+    Path,
+    tuple[tuple[int, int], list[HeadingEntry], list[tuple[int, int]]],
+] = {}
+
+
+def _iter_md(root: Path) -> Iterator[tuple[Path, int, int]]:
+    """Yield (path, mtime_ns, size) for every .md file under *root*, unordered.
+
+    An explicit os.scandir walk: Path objects are only built for the .md files
+    themselves, and directory entries never need a stat() of their own.
+    Unreadable directories are skipped, as rglob does.
+    """
+    stack = [os.fspath(root)]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                        continue
+                    if not entry.name.endswith(".md"):
+                        continue
+                    st = entry.stat()
+                except OSError:
+                    continue
+                yield Path(entry.path), st.st_mtime_ns, st.st_size
 
 
-def build_heading_index(search_root: Path) -> list[HeadingEntry]:
-    """Scan all .md files under *search_root* and extract headings.
+def _md_listing(search_root: Path) -> tuple[tuple[Path, int, int], ...]:
+    """(path, mtime_ns, size) for every .md file under *search_root*, sorted by path."""
+    if search_root.is_dir():
+        return tuple(sorted(_iter_md(search_root)))
+    try:
+        st = search_root.stat()
+    except OSError:
+        return ()
+    return ((search_root, st.st_mtime_ns, st.st_size),)
 
-    Returns a list of HeadingEntry sorted by file then line number.
-    Results are NOT cached — the caller should cache if needed.
+
+def _parse_headings(filepath: Path) -> tuple[list[HeadingEntry], list[tuple[int, int]]]:
+    """Extract the headings of one markdown file. Raises OSError if it cannot be read.
+
+    Returns the headings and the (line_number, level) "marks" of every line
+    starting with "#", including the text-less ones no heading is made for.
+    The file is streamed line by line and only heading lines are kept, so the
+    whole text is never held in memory.
     """
-    md_files = sorted(search_root.rglob("*.md")) if search_root.is_dir() else [search_root]
     entries: list[HeadingEntry] = []
-
-    for filepath in md_files:
-        try:
-            lines = filepath.read_text(encoding="utf-8").splitlines()
-        except OSError:
-            continue
-        for lineno, line in enumerate(lines, 1):
+    marks: list[tuple[int, int]] = []
+    with filepath.open(encoding="utf-8", errors="replace") as fh:
+        for lineno, line in enumerate(fh, 1):
             stripped = line.strip()
             if not stripped.startswith("#"):
                 continue
-            # Count heading level
-            level = 0
-            for ch in stripped:
-                if ch == "#":
-                    level += 1
-                else:
-                    break
+            level = len(stripped) - len(stripped.lstrip("#"))
+            marks.append((lineno, level))
             text = stripped[level:].strip()
             if text:
                 entries.append(HeadingEntry(
@@ -169,8 +311,57 @@ def build_heading_index(search_root: Path) -> list[HeadingEntry]:
                     line_number=lineno,
                     level=level,
                 ))
+    return entries, marks
 
-    return entries
+
+def build_heading_index(search_root: Path) -> list[HeadingEntry]:
+    """Scan all .md files under *search_root* and extract headings.
+
+    Returns a list of HeadingEntry sorted by file then line number.
+    Results are cached per search root and revalidated with one stat() per
+    file; only new or modified files are re-read.
+    """
+    return list(_heading_index(search_root, _md_listing(search_root))[0])
+
+
+def _build_postings(index: Sequence[HeadingEntry]) -> dict[str, list[int]]:
+    """Inverted index: heading token → positions in *index* of the headings containing it."""
+    postings: dict[str, list[int]] = {}
+    for pos, entry in enumerate(index):
+        for token in entry.tokens:
+            postings.setdefault(token, []).append(pos)
+    return postings
+
+
+def _heading_index(
+    search_root: Path,
+    listing: tuple[tuple[Path, int, int], ...],
+) -> tuple[list[HeadingEntry], dict[str, list[int]]]:
+    """build_heading_index for a listing the caller already has, plus its postings.
+
+    Returns the cached objects themselves; callers must not mutate them.
+    """
+    cached = _HEADING_INDEX_CACHE.get(search_root)
+    if cached is not None and cached[0] == listing:
+        return cached[1], cached[2]
+
+    # Parsed serially on purpose: with the files in the page cache this is a
+    # pure-Python line scan under the GIL, and a thread pool measured slower.
+    # Only new or modified files get here anyway.
+    entries: list[HeadingEntry] = []
+    for filepath, mtime_ns, size in listing:
+        file_cached = _FILE_HEADINGS_CACHE.get(filepath)
+        if file_cached is None or file_cached[0] != (mtime_ns, size):
+            try:
+                file_cached = ((mtime_ns, size), *_parse_headings(filepath))
+            except OSError:
+                continue
+            _FILE_HEADINGS_CACHE[filepath] = file_cached
+        entries.extend(file_cached[1])
+
+    postings = _build_postings(entries)
+    _HEADING_INDEX_CACHE[search_root] = (listing, entries, postings)
+    return entries, postings
 
 
 # ---------------------------------------------------------------------------
@@ -178,60 +369,123 @@ def build_heading_index(search_root: Path) -> list[HeadingEntry]:
 # ---------------------------------------------------------------------------
 
 def _similarity(a: str, b: str) -> float:
-    """Return SequenceMatcher ratio between two lowercased strings."""
+    """Return the similarity ratio (0.0–1.0) between two lowercased strings.
+
+    rapidfuzz's ratio when available (2·M/T with M the exact longest common
+    subsequence, in C), otherwise difflib's SequenceMatcher ratio, whose M sums
+    greedy longest matching blocks and can be lower. The two are not
+    interchangeable: a heading near *threshold* may pass with one and not the
+    other, and ties can resolve differently.
+    """
+    if _rapidfuzz_ratio is not None:
+        return _rapidfuzz_ratio(a.lower(), b.lower()) / 100.0
     return SequenceMatcher(None, a.lower(), b.lower()).ratio()
 
 
 def _fuzzy_match_headings(
     term: str,
-    index: list[HeadingEntry],
+    index: Sequence[HeadingEntry],
     threshold: float = 0.40,
     max_results: int = 8,
+    postings: dict[str, list[int]] | None = None,
 ) -> list[tuple[HeadingEntry, float]]:
     """Find headings similar to *term* (including synonym variants).
 
     Returns (heading, best_score) pairs sorted by score descending.
     A heading only needs to match ONE synonym variant above *threshold*.
+    *postings* is _build_postings(index), built here if not given.
     """
     variants = expand_synonyms(term, max_variants=12)
-    scored: dict[HeadingEntry, float] = {}
-
-    for entry in index:
-        best = 0.0
-        heading_lower = entry.text.lower()
-        for variant in variants:
-            # Full-string similarity
-            s = _similarity(variant, heading_lower)
-            best = max(best, s)
-            # Also check if the variant is a substring of the heading (strong signal)
-            if variant in heading_lower or heading_lower in variant:
-                best = max(best, 0.75)
+    if postings is None:
+        postings = _build_postings(index)
+
+    # Cheap signals for every heading first. Token overlap comes straight from
+    # the postings, so headings sharing no token with a variant cost nothing.
+    cheap = [0.0] * len(index)
+    for variant in variants:
+        tokens = set(variant.split())
+        counts: dict[int, int] = {}
+        for token in tokens:
+            for pos in postings.get(token, ()):
+                counts[pos] = counts.get(pos, 0) + 1
+        for pos, count in counts.items():
             # Token overlap boost — if most tokens appear in the heading
-            variant_tokens = set(variant.split())
-            heading_tokens = set(heading_lower.replace("(", " ").replace(")", " ").split())
-            if variant_tokens and heading_tokens:
-                overlap = len(variant_tokens & heading_tokens) / len(variant_tokens)
-                best = max(best, overlap * 0.85)
-        if best >= threshold:
-            scored[entry] = max(scored.get(entry, 0.0), best)
-
-    results = sorted(scored.items(), key=lambda x: x[1], reverse=True)
-    return results[:max_results]
+            overlap = count / len(tokens)
+            cheap[pos] = max(cheap[pos], overlap * 0.85)
+    for pos, entry in enumerate(index):
+        # Substring of the heading (strong signal)
+        heading_lower = entry.text_lower
+        if cheap[pos] < 0.75 and any(v in heading_lower or heading_lower in v for v in variants):
+            cheap[pos] = 0.75
+
+    # Full-string similarity (see _similarity), strongest candidates first.
+    # A heading can only make the results if it reaches *floor*: the threshold,
+    # or the lowest of the best max_results scores so far once there are that
+    # many — so similarity is skipped whenever its upper bound is below that.
+    top: list[float] = []   # min-heap of the best max_results scores
+    scored: list[tuple[float, int]] = []
+    for pos in sorted(range(len(index)), key=cheap.__getitem__, reverse=True):
+        best = cheap[pos]
+        floor = max(threshold, top[0]) if len(top) >= max_results else threshold
+        heading_lower = index[pos].text_lower
+        if _rapidfuzz_ratio is not None:
+            for variant in variants:
+                cutoff = max(best * 100, floor * 100 - 1e-9)
+                best = max(best, _rapidfuzz_ratio(variant, heading_lower, score_cutoff=cutoff) / 100.0)
+        else:
+            # The heading is seq2, whose analysis SequenceMatcher keeps across set_seq1()
+            matcher = SequenceMatcher(None, "", heading_lower)
+            for variant in variants:
+                matcher.set_seq1(variant)
+                bound = max(best, floor)
+                if matcher.real_quick_ratio() >= bound and matcher.quick_ratio() >= bound:
+                    best = max(best, matcher.ratio())
+        if best >= floor:
+            scored.append((best, pos))
+            if len(top) < max_results:
+                heappush(top, best)
+            elif best > top[0]:
+                heappushpop(top, best)
+
+    # Ties keep index order
+    scored.sort(key=lambda x: (-x[0], x[1]))
+    return [(index[pos], score) for score, pos in scored[:max_results]]
 
 
 # ---------------------------------------------------------------------------
 # 4. Context extractor — reads lines around a heading
 # ---------------------------------------------------------------------------
 
+def _read_lines(filepath: Path, file_cache: dict[Path, list[str] | None]) -> list[str] | None:
+    """Lines of *filepath*, read at most once per *file_cache*; None if it cannot be read.
+
+    Lines are split exactly as _parse_headings numbers them (universal newlines).
+    """
+    try:
+        return file_cache[filepath]
+    except KeyError:
+        pass
+    try:
+        with filepath.open(encoding="utf-8", errors="replace") as fh:
+            lines: list[str] | None = [line.rstrip("\n") for line in fh]
+    except OSError:
+        lines = None
+    file_cache[filepath] = lines
+    return lines
+
+
 def _extract_heading_context(
     entry: HeadingEntry,
     context_lines: int,
     docs_root: Path,
+    file_cache: dict[Path, list[str] | None] | None = None,
 ) -> str:
-    """Read lines around a heading entry and format them for display."""
-    try:
-        lines = entry.filepath.read_text(encoding="utf-8").splitlines()
-    except OSError:
+    """Read lines around a heading entry and format them for display.
+
+    Pass the same *file_cache* for several entries to read each file once.
+    """
+    lines = _read_lines(entry.filepath, {} if file_cache is None else file_cache)
+    if lines is None:
         return f"  (could not read {entry.filepath})"
 
     # Read from the heading line downward until the next heading of same-or-higher level,
@@ -240,17 +494,23 @@ def _extract_heading_context(
     max_end = min(len(lines), start + context_lines * 3 + 1)
     end = max_end
 
-    for i in range(start + 1, max_end):
-        stripped = lines[i].strip()
-        if stripped.startswith("#"):
-            # Check if this heading is same-or-higher level
-            hlevel = 0
-            for ch in stripped:
-                if ch == "#":
-                    hlevel += 1
-                else:
-                    break
-            if hlevel <= entry.level:
+    # The index already knows where every heading in the file is: binary-search
+    # past this one, then take the first same-or-higher level heading
+    cached = _FILE_HEADINGS_CACHE.get(entry.filepath)
+    marks = cached[2] if cached is not None else []
+    pos = bisect_right(marks, (entry.line_number, entry.level))
+    if pos and marks[pos - 1] == (entry.line_number, entry.level):
+        for lineno, level in islice(marks, pos, None):
+            if lineno > max_end:
+                break
+            if level <= entry.level:
+                end = lineno - 1
+                break
+    else:
+        # File not indexed (or changed since): scan the lines themselves
+        for i in range(start + 1, max_end):
+            stripped = lines[i].strip()
+            if stripped.startswith("#") and len(stripped) - len(stripped.lstrip("#")) <= entry.level:
                 end = i
                 break
 
@@ -270,6 +530,78 @@ def _extract_heading_context(
 # 5. Public API — the main fuzzy search function
 # ---------------------------------------------------------------------------
 
+# Below this many variants, plain substring search beats one fused regex
+_LITERAL_MAX_VARIANTS = 6
+
+
+def _variant_matcher(variants: Sequence[str]) -> Callable[[str], str | None]:
+    """Return a function giving the (lowercased) variant found in a line, or None.
+
+    The leftmost match wins, the longest variant on ties. A few variants are
+    found with str.find on the lowercased line; more are scanned for in one
+    pass, by an Aho-Corasick automaton when pyahocorasick is installed, else
+    by one longest-first alternation regex.
+    """
+    needles = sorted({v.lower() for v in variants}, key=len, reverse=True)
+
+    if len(needles) < _LITERAL_MAX_VARIANTS:
+        def match_literal(line: str) -> str | None:
+            line_lower = line.lower()
+            found, found_at = None, len(line_lower)
+            for needle in needles:
+                pos = line_lower.find(needle, 0, found_at + len(needle))
+                if pos != -1 and pos < found_at:
+                    found, found_at = needle, pos
+            return found
+        return match_literal
+
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for needle in needles:
+            automaton.add_word(needle, needle)
+        automaton.make_automaton()
+        longest = len(needles[0])
+
+        def match_automaton(line: str) -> str | None:
+            found, found_at = None, -1
+            # Hits arrive in order of end position; once no needle could
+            # still start at or before the best start, stop scanning
+            for end, needle in automaton.iter(line.lower()):
+                if found is not None and end - longest >= found_at:
+                    break
+                start = end - len(needle) + 1
+                if found is None or start < found_at or (start == found_at and len(needle) > len(found)):
+                    found, found_at = needle, start
+            return found
+        return match_automaton
+
+    regex = re.compile("|".join(re.escape(n) for n in needles), re.IGNORECASE)
+
+    def match_regex(line: str) -> str | None:
+        m = regex.search(line)
+        return m.group(0).lower() if m else None
+    return match_regex
+
+
+def _synonym_hits(
+    md_files: Sequence[Path],
+    match_line: Callable[[str], str | None],
+    file_cache: dict[Path, list[str] | None],
+) -> Iterator[tuple[Path, list[str], int, str]]:
+    """Yield (filepath, lines, line index, variant) for every matching line, file by file.
+
+    Lazy, so a capped consumer stops reading and scanning as soon as it has
+    enough hits.
+    """
+    for filepath in md_files:
+        lines = _read_lines(filepath, file_cache)
+        if lines is None:
+            continue
+        for i, line in enumerate(lines):
+            if variant := match_line(line):
+                yield filepath, lines, i, variant
+
+
 def fuzzy_search(
     term: str,
     search_root: Path,
@@ -292,88 +624,71 @@ def fuzzy_search(
     Returns:
         Formatted string of fuzzy results, or empty string if nothing found.
     """
-    blocks: list[str] = []
+    # Output lines are written straight into one buffer, each preceded by "\n"
+    out = StringIO()
     total = 0
+    # Each file is read at most once per call, shared by both phases
+    file_cache: dict[Path, list[str] | None] = {}
 
     # --- Phase 1: Synonym-expanded regex search ---
     variants = expand_synonyms(term, max_variants=12)
     # Skip the first variant (it's the original term — already searched by exact regex)
     synonym_variants = variants[1:]
 
+    # One directory walk serves both phases
+    listing = _md_listing(search_root)
+
     if synonym_variants:
-        md_files = sorted(search_root.rglob("*.md")) if search_root.is_dir() else [search_root]
-        seen_lines: set[tuple[str, int]] = set()  # (filename, line_index)
+        md_files = [filepath for filepath, _, _ in listing]
+        match_line = _variant_matcher(synonym_variants)
+        hits = islice(_synonym_hits(md_files, match_line, file_cache), 20)
 
-        for variant in synonym_variants:
+        for filepath, file_hits in groupby(hits, key=lambda hit: hit[0]):
             try:
-                regex = re.compile(re.escape(variant), re.IGNORECASE)
-            except re.error:
-                continue
-
-            for filepath in md_files:
-                try:
-                    rel = str(filepath.relative_to(docs_root))
-                except ValueError:
-                    rel = filepath.name
-                try:
-                    lines = filepath.read_text(encoding="utf-8").splitlines()
-                except OSError:
-                    continue
-
-                match_indices = [i for i, ln in enumerate(lines) if regex.search(ln)]
-                if not match_indices:
-                    continue
-
-                file_block: list[str] = []
-                for mi in match_indices:
-                    key = (rel, mi)
-                    if key in seen_lines:
-                        continue
-                    seen_lines.add(key)
-
-                    if not file_block:
-                        file_block.append(f"\n--- docs/{rel} [synonym: '{variant}'] ---")
-
-                    s = max(0, mi - context_lines)
-                    e = min(len(lines), mi + context_lines + 1)
-                    for i in range(s, e):
-                        line_key = (rel, i)
-                        if line_key not in seen_lines or i == mi:
-                            marker = ">>>" if i == mi else "   "
-                            file_block.append(f"  {marker} L{i + 1:4d}: {lines[i]}")
-                    file_block.append("")
-                    total += 1
-
-                    if total >= 20:
-                        break
-
-                blocks.extend(file_block)
-                if total >= 20:
-                    break
-            if total >= 20:
-                break
+                rel = str(filepath.relative_to(docs_root))
+            except ValueError:
+                rel = filepath.name
+
+            file_block = StringIO()               # written out once its labels are known
+            file_variants: dict[str, None] = {}   # matched variants, in first-seen order
+            emitted: set[int] = set()             # match lines already printed
+            for _, lines, mi, variant in file_hits:
+                emitted.add(mi)
+                file_variants[variant] = None
+
+                s = max(0, mi - context_lines)
+                e = min(len(lines), mi + context_lines + 1)
+                for i in range(s, e):
+                    if i not in emitted or i == mi:
+                        marker = ">>>" if i == mi else "   "
+                        file_block.write(f"\n  {marker} L{i + 1:4d}: {lines[i]}")
+                file_block.write("\n")
+                total += 1
+
+            labels = ", ".join(f"'{v}'" for v in file_variants)
+            out.write(f"\n\n--- docs/{rel} [synonym: {labels}] ---")
+            out.write(file_block.getvalue())
 
     # --- Phase 2: Heading-level fuzzy search ---
-    index = build_heading_index(search_root)
-    fuzzy_hits = _fuzzy_match_headings(term, index, threshold=threshold)
+    index, postings = _heading_index(search_root, listing)
+    fuzzy_hits = _fuzzy_match_headings(term, index, threshold=threshold, postings=postings)
 
     if fuzzy_hits:
-        blocks.append("\n--- Fuzzy heading matches ---")
+        out.write("\n\n--- Fuzzy heading matches ---")
         for entry, score in fuzzy_hits:
             try:
                 rel = str(entry.filepath.relative_to(docs_root))
             except ValueError:
                 rel = entry.filepath.name
-            blocks.append(f"  docs/{rel} — \"{entry.text}\" (score={score:.2f})")
-            ctx = _extract_heading_context(entry, context_lines, docs_root)
-            blocks.append(ctx)
-            blocks.append("")
+            out.write(f"\n  docs/{rel} — \"{entry.text}\" (score={score:.2f})\n")
+            out.write(_extract_heading_context(entry, context_lines, docs_root, file_cache))
+            out.write("\n")
             total += 1
             if total >= 30:
                 break
 
-    if not blocks:
+    if not out.tell():
         return ""
 
-    header = f"\n[{total} fuzzy/synonym result(s) for '{term}']\n"
-    return header + "\n".join(blocks)
+    header = f"\n[{total} fuzzy/synonym result(s) for '{term}']"
+    return header + out.getvalue()